@@ -0,0 +1,121 @@
+"""CPU cost and bytes saved by each response encoding and level.
+
+Run with the usual settings in the environment (or ``.env``)::
+
+    python -m benchmarks.compression --rows 1000 --rounds 5
+
+Each table of a scratch SQLite file is filled with ``--rows`` rows of
+Portuguese filler text from Faker, which compresses far less than the
+repeated sentence of the other benchmarks. A list page of every table and
+the patients export are fetched uncompressed, then compressed with every
+installed codec at a few levels, in one piece as the middleware does for
+ordinary responses and in ``--chunk-kib`` chunks, each flushed, as it does
+for streamed ones. The report gives the median CPU
+milliseconds per body, MiB compressed per CPU second and the share of
+bytes saved.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from faker import Faker
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.serialization import ENDPOINTS, fake_row
+from fast_zero import compression, pagination
+from fast_zero.app import app
+from fast_zero.database import get_async_session, get_async_url, get_session_factory
+from fast_zero.models import table_registry
+
+LEVELS = {'gzip': [1, 6, 9], 'br': [1, 4, 6], 'zstd': [1, 3, 9]}
+
+
+def seed(url: str, rows: int):
+    fake = Faker('pt_BR')
+    fake.seed_instance(0)
+    engine = create_engine(url)
+    table_registry.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for model in dict.fromkeys(ENDPOINTS.values()):
+            values = [
+                {
+                    name: fake.text(400) if isinstance(value, str) and name != 'email' else value
+                    for name, value in fake_row(model, number).items()
+                }
+                for number in range(rows)
+            ]
+            connection.execute(insert(model), values)
+    engine.dispose()
+
+
+def fetch_bodies(url: str, rows: int) -> dict[str, bytes]:
+    session_factory = async_sessionmaker(create_async_engine(get_async_url(url)), expire_on_commit=False)
+
+    async def get_session_override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = get_session_override
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+    with TestClient(app, headers={'Accept-Encoding': 'identity'}) as client:
+        bodies = {endpoint: client.get(f'{endpoint}?limit={rows}').content for endpoint in ENDPOINTS}
+        bodies['/patients/export'] = client.get('/patients/export').content
+
+    app.dependency_overrides.clear()
+    return bodies
+
+
+def compress(encoding: str, level: int, body: bytes, chunk_size: int | None) -> bytes:
+    compressor = compression.CODECS[encoding](level)
+    if chunk_size is None:
+        return compressor.finish(body)
+
+    chunks = [compressor.compress(body[start : start + chunk_size]) for start in range(0, len(body), chunk_size)]
+    return b''.join(chunks) + compressor.finish()
+
+
+def measure(encoding: str, level: int, body: bytes, chunk_size: int | None, rounds: int) -> tuple[float, int]:
+    """Median CPU seconds to compress ``body`` and the compressed size."""
+    timings = []
+    for _ in range(rounds):
+        started = time.process_time()
+        compressed = compress(encoding, level, body, chunk_size)
+        timings.append(time.process_time() - started)
+    return statistics.median(timings), len(compressed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--chunk-kib', type=int, default=64)
+    args = parser.parse_args()
+
+    pagination.settings = pagination.settings.model_copy(update={'PAGE_SIZE_MAX': args.rows})
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f'sqlite:///{Path(directory) / "bench.db"}'
+        seed(url, args.rows)
+        bodies = fetch_bodies(url, args.rows)
+
+    print(f'{"body":<28}{"KiB":>8}{"encoding":>10}{"level":>7}{"mode":>8}{"cpu ms":>9}{"MiB/s":>9}{"saved":>8}')
+    for name, body in bodies.items():
+        for encoding in compression.CODECS:
+            for level in LEVELS[encoding]:
+                for mode, chunk_size in (('whole', None), ('chunked', args.chunk_kib * 1024)):
+                    seconds, size = measure(encoding, level, body, chunk_size, args.rounds)
+                    throughput = len(body) / 2**20 / seconds if seconds else float('inf')
+                    print(
+                        f'{name:<28}{len(body) / 1024:>8.0f}{encoding:>10}{level:>7}{mode:>8}'
+                        f'{seconds * 1000:>9.1f}{throughput:>9.0f}{1 - size / len(body):>8.1%}'
+                    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Memory and throughput of a list page read as ORM instances or as plain rows.
+
+Run with the usual settings in the environment (or ``.env``)::
+
+    python -m benchmarks.list_rows --rows 10000 --rounds 5
+
+Each table of a scratch SQLite file is filled with ``--rows`` rows. A page
+of all of them is then read the way the list endpoints used to, as mapped
+instances in the session, and the way they do now, through
+``select_rows``, and validated into the list schema. The report gives the
+median time per page, rows per second and the peak memory of one page.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.serialization import seed
+from fast_zero.database import get_async_url
+from fast_zero.models import (
+    ClinicalExamination,
+    ClinicalHistory,
+    ComplementaryExam,
+    Patient,
+    PhysiotherapyDiagosis,
+    Prognosis,
+    TreatmentPlan,
+)
+from fast_zero.pagination import select_rows
+from fast_zero.schemas import (
+    ClinicalExaminationPublic,
+    ClinicalHistoryPublic,
+    ComplementaryExamsPublic,
+    PatientPublic,
+    PhysiotherapyDiagnosisPublic,
+    PrognosisPublic,
+    TreatmentPlanPublic,
+)
+
+MODELS = {
+    Patient: PatientPublic,
+    ClinicalHistory: ClinicalHistoryPublic,
+    ClinicalExamination: ClinicalExaminationPublic,
+    ComplementaryExam: ComplementaryExamsPublic,
+    PhysiotherapyDiagosis: PhysiotherapyDiagnosisPublic,
+    Prognosis: PrognosisPublic,
+    TreatmentPlan: TreatmentPlanPublic,
+}
+
+
+async def read_page(session_factory, query, adapter: TypeAdapter, entity: bool) -> bytes:
+    async with session_factory() as session:
+        result = await session.execute(query)
+        items = result.scalars().all() if entity else result.all()
+        return adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+
+
+async def measure(session_factory, model, rounds: int) -> dict[str, tuple[float, float]]:
+    """Median seconds per page and peak MiB of one page, for each way of reading it."""
+    adapter = TypeAdapter(list[MODELS[model]])
+    ways = {'orm': (select(model), True), 'rows': (select_rows(model), False)}
+    report = {}
+
+    for way, (query, entity) in ways.items():
+        await read_page(session_factory, query, adapter, entity)
+
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            await read_page(session_factory, query, adapter, entity)
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        await read_page(session_factory, query, adapter, entity)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        report[way] = statistics.median(timings), peak / 2**20
+
+    return report
+
+
+async def run(url: str, rows: int, rounds: int):
+    async_engine = create_async_engine(get_async_url(url))
+    session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    print(f'{"table":<26}{"orm ms":>10}{"rows ms":>10}{"orm rows/s":>12}{"rows rows/s":>13}', end='')
+    print(f'{"orm MiB":>10}{"rows MiB":>10}')
+    for model in MODELS:
+        report = await measure(session_factory, model, rounds)
+        (orm_seconds, orm_mib), (rows_seconds, rows_mib) = report['orm'], report['rows']
+        print(
+            f'{model.__tablename__:<26}{orm_seconds * 1000:>10.1f}{rows_seconds * 1000:>10.1f}'
+            f'{rows / orm_seconds:>12.0f}{rows / rows_seconds:>13.0f}{orm_mib:>10.1f}{rows_mib:>10.1f}'
+        )
+
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f'sqlite:///{Path(directory) / "bench.db"}'
+        seed(url, args.rows)
+        asyncio.run(run(url, args.rows, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Throughput of every list endpoint with and without ``FAST_SERIALIZATION``.
+
+Run with the usual settings in the environment (or ``.env``)::
+
+    python -m benchmarks.serialization --rows 1000 --requests 20
+
+Each table of a scratch SQLite file is filled with ``--rows`` rows, then
+every list endpoint is asked for a page of all of them through the
+standard FastAPI response path and through ``fast_zero.serialization``.
+Both paths run the same query, so the difference is serialisation.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from fast_zero import pagination, serialization
+from fast_zero.app import app
+from fast_zero.database import get_async_session, get_async_url
+from fast_zero.models import (
+    ClinicalExamination,
+    ClinicalHistory,
+    ComplementaryExam,
+    Patient,
+    PhysiotherapyDiagosis,
+    Prognosis,
+    TreatmentPlan,
+    User,
+    table_registry,
+)
+
+TEXT = 'Paciente relata dor lombar há três meses, com piora ao final do dia e melhora em repouso. '
+
+ENDPOINTS = {
+    '/users/': User,
+    '/patients/': Patient,
+    '/clinical-history/': ClinicalHistory,
+    '/clinical-examination/': ClinicalExamination,
+    '/complementary-exams/': ComplementaryExam,
+    '/physiotherapy-diagnosis/': PhysiotherapyDiagosis,
+    '/prognosis/': Prognosis,
+    '/treatment-plan/': TreatmentPlan,
+}
+
+
+def fake_row(model, number: int) -> dict:
+    row = {}
+    for column in model.__table__.columns:
+        if column.primary_key or column.server_default is not None:
+            continue
+        if column.foreign_keys:
+            row[column.name] = 1
+        elif column.name == 'email':
+            row[column.name] = f'user{number}@example.com'
+        elif column.type.python_type is int:
+            row[column.name] = number % 90 + 1
+        else:
+            row[column.name] = f'{number} {TEXT * 2}'
+    return row
+
+
+def seed(url: str, rows: int):
+    engine = create_engine(url)
+    table_registry.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for model in dict.fromkeys(ENDPOINTS.values()):
+            connection.execute(insert(model), [fake_row(model, number) for number in range(rows)])
+    engine.dispose()
+
+
+def measure(client: TestClient, url: str, requests: int, modes: dict) -> tuple[dict[str, float], int]:
+    """Milliseconds per request in each mode; the modes take turns so drift hits them equally."""
+    for mode_settings in modes.values():
+        serialization.settings = mode_settings
+        response = client.get(url)
+
+    elapsed = dict.fromkeys(modes, 0.0)
+    for _ in range(requests):
+        for mode, mode_settings in modes.items():
+            serialization.settings = mode_settings
+            started = time.perf_counter()
+            client.get(url)
+            elapsed[mode] += time.perf_counter() - started
+
+    return {mode: seconds / requests * 1000 for mode, seconds in elapsed.items()}, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000)
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    pagination.settings = pagination.settings.model_copy(update={'PAGE_SIZE_MAX': args.rows})
+    modes = {
+        'standard': serialization.settings.model_copy(update={'FAST_SERIALIZATION': False}),
+        'fast': serialization.settings.model_copy(update={'FAST_SERIALIZATION': True}),
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = f'sqlite:///{Path(directory) / "bench.db"}'
+        seed(url, args.rows)
+        session_factory = async_sessionmaker(create_async_engine(get_async_url(url)), expire_on_commit=False)
+
+        async def get_session_override():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = get_session_override
+
+        print(f'{"endpoint":<28}{"standard ms":>14}{"fast ms":>10}{"speed-up":>10}{"KiB":>8}')
+        with TestClient(app) as client:
+            for endpoint in ENDPOINTS:
+                timings, size = measure(client, f'{endpoint}?limit={args.rows}', args.requests, modes)
+                print(
+                    f'{endpoint:<28}{timings["standard"]:>14.1f}{timings["fast"]:>10.1f}'
+                    f'{timings["standard"] / timings["fast"]:>9.2f}x{size / 1024:>8.0f}'
+                )
+
+        app.dependency_overrides.clear()
+
+
+if __name__ == '__main__':
+    main()
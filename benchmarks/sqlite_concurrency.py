@@ -0,0 +1,100 @@
+"""Read/write concurrency on the SQLite file with and without the tuning profile.
+
+Run with the usual settings in the environment (or ``.env``)::
+
+    python -m benchmarks.sqlite_concurrency --readers 4 --seconds 5
+
+One writer thread inserts patients one transaction at a time while the
+reader threads page through the table. The default rollback journal
+blocks readers for the duration of every write; WAL does not.
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, exc, insert, select
+
+from fast_zero.database import set_sqlite_pragmas
+from fast_zero.models import Patient, table_registry
+
+PATIENT = {
+    'full_name': 'Maria Aparecida',
+    'age': 58,
+    'place_of_birth': 'Rio de Janeiro-RJ',
+    'marital_status': 'Casada',
+    'gender': 'Feminino',
+    'profession': 'Professora',
+    'residential_address': 'Rua X, 345, Centro - Rio de Janeiro - RJ',
+    'commercial_address': 'Rua Y, 600, Barra da Tijuca - Rio de Janeiro - RJ',
+}
+
+
+def run(path: Path, tuned: bool, readers: int, seconds: float) -> dict[str, int]:
+    engine = create_engine(f'sqlite:///{path}', pool_size=readers + 1, connect_args={'timeout': 1})
+    if tuned:
+        event.listen(engine, 'connect', set_sqlite_pragmas)
+
+    table_registry.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Patient), [PATIENT] * 1_000)
+
+    counts = {'reads': 0, 'writes': 0, 'locked': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def count(key):
+        with lock:
+            counts[key] += 1
+
+    def reader():
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as connection:
+                    connection.execute(select(Patient).order_by(Patient.id.desc()).limit(50)).all()
+                count('reads')
+            except exc.OperationalError:
+                count('locked')
+
+    def writer():
+        while time.perf_counter() < deadline:
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(Patient).values(**PATIENT))
+                count('writes')
+            except exc.OperationalError:
+                count('locked')
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f'{"profile":<10}{"reads/s":>12}{"writes/s":>12}{"locked":>10}')
+    for tuned in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            counts = run(Path(directory) / 'bench.db', tuned, args.readers, args.seconds)
+        print(
+            f'{"tuned" if tuned else "default":<10}'
+            f'{counts["reads"] / args.seconds:>12.0f}'
+            f'{counts["writes"] / args.seconds:>12.0f}'
+            f'{counts["locked"]:>10}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Cold-start cost of importing the app, from ``python -X importtime``.
+
+Run with the usual settings in the environment (or ``.env``)::
+
+    python -m benchmarks.startup --runs 5 --top 15
+
+Every run imports ``fast_zero.app`` in a fresh interpreter, as a new worker
+does. The report lists the median wall time, the median import time of the
+app and the modules that cost the most on the median run. ``--budget-ms``
+makes the command fail when the median import time goes over it, so a
+regression shows up in CI.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+MODULE = 'fast_zero.app'
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map each imported module to its self and cumulative time in microseconds."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix('import time:').split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def run(module: str) -> tuple[float, dict[str, tuple[int, int]]]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - started, parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default=MODULE)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, help='fail when the median import takes longer')
+    args = parser.parse_args()
+
+    runs = sorted((run(args.module) for _ in range(args.runs)), key=lambda result: result[1][args.module][1])
+    wall = statistics.median(seconds for seconds, _ in runs)
+    _, timings = runs[len(runs) // 2]
+    import_ms = timings[args.module][1] / 1000
+
+    print(f'{"wall time":<40}{wall * 1000:>10.1f} ms')
+    print(f'{"import " + args.module:<40}{import_ms:>10.1f} ms')
+    print()
+    print(f'{"module":<40}{"self ms":>10}{"total ms":>10}')
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f'{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>10.1f}')
+
+    if args.budget_ms is not None and import_ms > args.budget_ms:
+        print(f'\nImporting {args.module} took {import_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget.')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,59 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
 
+from fast_zero.coalescer import WriteCoalescer
+from fast_zero.compression import CompressionMiddleware
+from fast_zero.database import new_async_session
+from fast_zero.openapi import load_openapi
 from fast_zero.routers import (
     auth,
     clinical_examination,
     clinical_history,
     complementary_exams,
+    docs,
+    imports,
+    metrics,
     patients,
     physiotherapy_diagnosis,
     prognosis,
+    search,
     treatment_plan,
     users,
 )
 from fast_zero.schemas import Message
+from fast_zero.security import get_password_hasher
+from fast_zero.settings import get_settings
 
-app = FastAPI()
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the schema before the first request rather than during it.
+    load_openapi(app, settings.OPENAPI_SCHEMA_FILE)
+
+    if settings.WRITE_COALESCING:
+        app.state.write_coalescer = WriteCoalescer(
+            new_async_session,
+            max_delay=settings.WRITE_COALESCING_MAX_DELAY_MS / 1000,
+            max_batch=settings.WRITE_COALESCING_MAX_BATCH,
+        )
+
+    yield
+
+    if settings.WRITE_COALESCING:
+        await app.state.write_coalescer.close()
+
+    get_password_hasher().close()
+
+
+# The routers in fast_zero.routers.docs serve the schema and the docs pages from memory.
+app = FastAPI(lifespan=lifespan, openapi_url=None, docs_url=None, redoc_url=None)
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(users.router)
 app.include_router(auth.router)
@@ -26,6 +64,18 @@ app.include_router(complementary_exams.router)
 app.include_router(physiotherapy_diagnosis.router)
 app.include_router(prognosis.router)
 app.include_router(treatment_plan.router)
+app.include_router(search.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
+app.include_router(docs.router)
+
+
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request, exc):
+    return JSONResponse(
+        status_code=HTTPStatus.CONFLICT,
+        content={'detail': 'Conflicts with the data already stored.'},
+    )
 
 
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
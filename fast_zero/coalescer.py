@@ -0,0 +1,108 @@
+import asyncio
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.crud import insert_returning
+from fast_zero.metrics import registry
+
+coalesced_batch_size = registry.histogram(
+    'write_coalescer_batch_size',
+    'Rows committed together by the write coalescer.',
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+# Queued by ``close`` after the last row; ``run`` commits what it holds and exits when it gets it.
+STOP = object()
+
+
+class WriteCoalescer:
+    """Commit inserts coming from concurrent requests in a single transaction.
+
+    Each ``submit`` waits until its row is part of a commit, which happens
+    once ``max_batch`` rows are queued or ``max_delay`` seconds after the
+    first one arrived, whichever comes first. When a batch fails every row
+    is retried in a transaction of its own, so only the callers whose row
+    is actually invalid get the error. ``close`` commits every row already
+    submitted; rows submitted after it are refused.
+    """
+
+    def __init__(self, session_factory, max_delay: float, max_batch: int):
+        self.session_factory = session_factory
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.queue = asyncio.Queue()
+        self.task = None
+        self.closed = False
+
+    async def submit(self, obj):
+        if self.closed:
+            raise RuntimeError('The write coalescer is closed.')
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((obj, future))
+        return await future
+
+    async def close(self):
+        self.closed = True
+        if self.task is not None:
+            await self.queue.put(STOP)
+            await self.task
+            self.task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await self.queue.get()
+            if item is STOP:
+                return
+
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), deadline - loop.time())
+                except TimeoutError:
+                    break
+                if item is STOP:
+                    await self.commit(batch)
+                    return
+                batch.append(item)
+
+            await self.commit(batch)
+
+    async def commit(self, batch):
+        try:
+            async with self.session_factory() as session:
+                session.add_all([obj for obj, _ in batch])
+                await session.commit()
+        except Exception as exc:
+            if len(batch) > 1:
+                for item in batch:
+                    await self.commit([item])
+                return
+
+            _, future = batch[0]
+            if not future.done():
+                future.set_exception(exc)
+            return
+
+        coalesced_batch_size.observe(len(batch))
+        for obj, future in batch:
+            if not future.done():
+                future.set_result(obj)
+
+
+def get_write_coalescer(request: Request) -> WriteCoalescer | None:
+    return getattr(request.app.state, 'write_coalescer', None)
+
+
+async def save(obj, session: AsyncSession, coalescer: WriteCoalescer | None):
+    """Insert a new row, through the coalescer when ``WRITE_COALESCING`` is on."""
+    if coalescer is not None:
+        return await coalescer.submit(obj)
+
+    return await insert_returning(session, obj)
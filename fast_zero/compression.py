@@ -0,0 +1,198 @@
+"""Response compression negotiated through ``Accept-Encoding``.
+
+gzip is always available. brotli (``br``) and zstd are used when the
+``brotli`` and ``zstandard`` packages are installed (the ``compression``
+extra). When the client accepts several of them equally, the order of
+``COMPRESSION_ENCODINGS`` decides.
+
+Bodies sent in one piece are compressed only from ``COMPRESSION_MINIMUM_SIZE``
+bytes. Streamed bodies, such as the exports, are compressed chunk by chunk
+and each chunk is flushed, so the client keeps receiving data as it is
+produced. Responses that already carry a ``Content-Encoding`` are left alone.
+Every response of a compressible type gets ``Vary: Accept-Encoding``, even
+when it goes out uncompressed, so shared caches keep the encodings apart.
+"""
+
+import zlib
+from http import HTTPStatus
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fast_zero.settings import get_settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+settings = get_settings()
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+CODECS = {'gzip': GzipCompressor}
+if brotli is not None:
+    CODECS['br'] = BrotliCompressor
+if zstandard is not None:
+    CODECS['zstd'] = ZstdCompressor
+
+
+def configured_encodings() -> dict[str, int]:
+    """The encodings of ``COMPRESSION_ENCODINGS`` that are installed, in order, with their levels."""
+    levels = {
+        'gzip': settings.COMPRESSION_GZIP_LEVEL,
+        'br': settings.COMPRESSION_BROTLI_QUALITY,
+        'zstd': settings.COMPRESSION_ZSTD_LEVEL,
+    }
+    names = (name.strip() for name in settings.COMPRESSION_ENCODINGS.split(','))
+    return {name: levels[name] for name in names if name in CODECS}
+
+
+def negotiate(accept_encoding: str, encodings) -> str | None:
+    """The encoding of ``encodings`` the client weighs highest, the first one on ties, or ``None``."""
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, *params = (piece.strip() for piece in part.split(';'))
+        weight = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if name:
+            weights[name.lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    best = max(encodings, key=lambda name: weights.get(name, wildcard), default=None)
+    if best is None or weights.get(best, wildcard) <= 0:
+        return None
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, encodings: dict[str, int] | None = None, minimum_size: int | None = None):
+        self.app = app
+        self.encodings = configured_encodings() if encodings is None else encodings
+        self.minimum_size = settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get('accept-encoding', ''), self.encodings)
+        responder = CompressionResponder(send, encoding, self.encodings.get(encoding), self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class CompressionResponder:
+    """Wraps ``send`` for one response; the choice to compress is made on its first body message.
+
+    ``encoding`` is ``None`` when the client accepts none of the configured ones.
+    """
+
+    def __init__(self, send: Send, encoding: str | None, level: int | None, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start = None
+        self.compressor = None
+
+    async def send(self, message: Message):
+        if message['type'] == 'http.response.start':
+            self.start = message
+        elif message['type'] != 'http.response.body':
+            await self._send(message)
+        elif self.start is not None:
+            start, self.start = self.start, None
+            await self.begin(start, message)
+        elif self.compressor is None:
+            await self._send(message)
+        else:
+            body, more_body = message.get('body', b''), message.get('more_body', False)
+            data = self.compressor.compress(body) if more_body else self.compressor.finish(body)
+            await self._send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+    async def begin(self, start: Message, message: Message):
+        headers = MutableHeaders(raw=start['headers'])
+        body, more_body = message.get('body', b''), message.get('more_body', False)
+
+        compressible = self.compressible(start['status'], headers)
+        if compressible and 'accept-encoding' not in {
+            value.strip().lower() for value in headers.get('vary', '').split(',')
+        }:
+            headers.add_vary_header('Accept-Encoding')
+
+        if not compressible or self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            await self._send(start)
+            await self._send(message)
+            return
+
+        self.compressor = CODECS[self.encoding](self.level)
+        headers['Content-Encoding'] = self.encoding
+        if more_body:
+            del headers['Content-Length']
+            data = self.compressor.compress(body)
+        else:
+            data = self.compressor.finish(body)
+            headers['Content-Length'] = str(len(data))
+
+        await self._send(start)
+        await self._send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+    @staticmethod
+    def compressible(status: int, headers: Headers) -> bool:
+        return (
+            status not in {HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED}
+            and 'content-encoding' not in headers
+            and headers.get('content-type', '').startswith(COMPRESSIBLE_TYPES)
+        )
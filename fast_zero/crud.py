@@ -0,0 +1,142 @@
+from collections import defaultdict
+from functools import cache
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+# Single-row writes are one statement each: INSERT/UPDATE ... RETURNING hands
+# back the row the response is built from, so there is no follow-up SELECT.
+# RETURNING needs SQLite 3.35+ or PostgreSQL.
+
+
+def column_values(model, values: dict) -> dict:
+    """Keep only the entries of ``values`` that are columns of ``model``."""
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    return {key: value for key, value in values.items() if key in columns}
+
+
+async def insert_returning(session: AsyncSession, obj):
+    state = inspect(obj)
+    values = column_values(state.mapper, state.dict)
+
+    db_obj = await session.scalar(insert(state.mapper.class_).values(**values).returning(state.mapper.class_))
+    await session.commit()
+
+    return db_obj
+
+
+async def update_returning(session: AsyncSession, model, pk: int, values: dict, detail: str):
+    pk_column = inspect(model).primary_key[0]
+    values = column_values(model, values)
+
+    if values:
+        statement = (
+            update(model)
+            .where(pk_column == pk)
+            .values(**values)
+            .returning(model)
+            .execution_options(populate_existing=True)
+        )
+    else:
+        statement = select(model).where(pk_column == pk)
+
+    db_obj = await session.scalar(statement)
+
+    if db_obj is None:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=detail)
+
+    await session.commit()
+
+    return db_obj
+
+
+async def delete_by_pk(session: AsyncSession, model, pk: int, detail: str):
+    pk_column = inspect(model).primary_key[0]
+
+    result = await session.execute(delete(model).where(pk_column == pk))
+
+    if result.rowcount == 0:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=detail)
+
+    await session.commit()
+
+
+@cache
+def list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(list[schema])
+
+
+def validate_items(schema, items: list) -> tuple[list[int], list, list[dict]]:
+    """Split ``items`` into the indexes and models that are valid, plus one error entry per invalid item."""
+    adapter = list_adapter(schema)
+
+    try:
+        return list(range(len(items))), adapter.validate_python(items), []
+    except ValidationError as exc:
+        invalid = defaultdict(list)
+        for error in exc.errors(include_url=False, include_context=False):
+            index, *loc = error['loc']
+            invalid[index].append({**error, 'loc': loc})
+
+    valid = [index for index in range(len(items)) if index not in invalid]
+    errors = [{'index': index, 'detail': detail} for index, detail in invalid.items()]
+
+    return valid, adapter.validate_python([items[index] for index in valid]), errors
+
+
+async def bulk_insert(session: AsyncSession, model, schema, items: list) -> dict:
+    """Validate ``items`` against ``schema`` and insert the valid ones.
+
+    Rows go in ``BULK_CHUNK_SIZE`` at a time, one executemany INSERT and
+    commit per chunk. A chunk the database rejects is retried row by row so the
+    other rows still get in. ``ids`` follows the order of ``items`` and is
+    ``None`` wherever ``errors`` has an entry for that index.
+    """
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.BULK_MAX_ITEMS} items per request.',
+        )
+
+    ids = [None] * len(items)
+    valid, rows, errors = validate_items(schema, items)
+
+    chunk_size = settings.BULK_CHUNK_SIZE
+    for start in range(0, len(valid), chunk_size):
+        chunk = list(zip(valid[start : start + chunk_size], rows[start : start + chunk_size]))
+        await insert_chunk(session, model, chunk, ids, errors)
+
+    return {'ids': ids, 'errors': sorted(errors, key=lambda error: error['index'])}
+
+
+async def insert_chunk(session: AsyncSession, model, chunk: list, ids: list | dict, errors: list):
+    pk_column = inspect(model).primary_key[0]
+    # sort_by_parameter_order keeps the returned ids in row order. PostgreSQL
+    # still gets multi-row INSERTs; SQLite can't order RETURNING, so SQLAlchemy
+    # sends it one row per statement, still within the chunk's transaction.
+    statement = insert(model).returning(pk_column, sort_by_parameter_order=True)
+
+    try:
+        new_ids = await session.scalars(statement, [column_values(model, row.model_dump()) for _, row in chunk])
+        new_ids = new_ids.all()
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        if len(chunk) > 1:
+            for item in chunk:
+                await insert_chunk(session, model, [item], ids, errors)
+            return
+
+        errors.append({'index': chunk[0][0], 'detail': 'Conflicts with the data already stored.'})
+        return
+
+    for (index, _), pk in zip(chunk, new_ids):
+        ids[index] = pk
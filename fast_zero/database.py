@@ -1,11 +1,260 @@
-from sqlalchemy import create_engine
+from functools import cache, partial
+from time import perf_counter
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, create_engine, event, exc, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.util.queue import FallbackAsyncAdaptedQueue, Queue
+
+from fast_zero.metrics import registry
+from fast_zero.settings import get_settings
+
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+}
+
+settings = get_settings()
+
+
+def get_async_url(url: str) -> str:
+    """Swap the DBAPI in ``url`` for the asyncio driver of its backend."""
+    sa_url = make_url(url)
+    driver = ASYNC_DRIVERS.get(sa_url.get_backend_name())
+
+    if driver is None or sa_url.get_driver_name() == driver:
+        return url
+
+    return sa_url.set(drivername=f'{sa_url.get_backend_name()}+{driver}').render_as_string(hide_password=False)
+
+
+pool_checkout_seconds = registry.histogram(
+    'db_pool_checkout_seconds',
+    'Time spent waiting for an idle connection from the pool, not counting opening new ones.',
+)
+pool_checkout_timeouts = registry.counter(
+    'db_pool_checkout_timeouts_total',
+    'Checkouts that gave up after DATABASE_POOL_TIMEOUT seconds.',
+)
+
+
+class TimedQueueMixin:
+    """Time every take from a pool's queue of idle connections.
+
+    A checkout only blocks there, when every connection is in use and no
+    more may be opened; opening a connection happens outside the queue and
+    is not counted.
+    """
+
+    def get(self, block: bool = True, timeout: float | None = None):
+        started = perf_counter()
+        try:
+            return super().get(block, timeout)
+        finally:
+            pool_checkout_seconds.observe(perf_counter() - started)
+
+
+class TimedQueue(TimedQueueMixin, Queue):
+    pass
+
+
+class TimedAsyncQueue(TimedQueueMixin, FallbackAsyncAdaptedQueue):
+    pass
+
+
+class InstrumentedPoolMixin:
+    """Count the checkouts that time out; ``TimedQueueMixin`` records how long they wait."""
+
+    def connect(self):
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    _queue_class = TimedQueue
+
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    _queue_class = TimedAsyncQueue
+
+
+def get_pool_options(url: str, poolclass: type[QueuePool]) -> dict:
+    # In-memory SQLite databases live inside a single connection, so they
+    # keep the dialect's own pool and cannot be sized.
+    if make_url(url).database in {None, '', ':memory:'}:
+        return {}
+
+    return {
+        'poolclass': poolclass,
+        'pool_size': settings.DATABASE_POOL_SIZE,
+        'max_overflow': settings.DATABASE_MAX_OVERFLOW,
+        'pool_timeout': settings.DATABASE_POOL_TIMEOUT,
+        'pool_recycle': settings.DATABASE_POOL_RECYCLE,
+        'pool_pre_ping': settings.DATABASE_POOL_PRE_PING,
+    }
+
+
+def get_sqlite_pragmas() -> dict[str, str | int]:
+    return {
+        'journal_mode': settings.SQLITE_JOURNAL_MODE,
+        'synchronous': settings.SQLITE_SYNCHRONOUS,
+        'mmap_size': settings.SQLITE_MMAP_SIZE,
+        'cache_size': settings.SQLITE_CACHE_SIZE,
+        'temp_store': settings.SQLITE_TEMP_STORE,
+        'busy_timeout': settings.SQLITE_BUSY_TIMEOUT,
+        # Only new writes are checked; files written without it may hold
+        # orphan rows, which ``PRAGMA foreign_key_check`` lists.
+        'foreign_keys': 'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF',
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply the SQLite tuning profile to every new DBAPI connection.
+
+    WAL lets readers keep going while a write is in progress, which the
+    default rollback journal does not.
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in get_sqlite_pragmas().items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+
+def use_sqlite_pragmas(engine: Engine):
+    if settings.SQLITE_PRAGMAS and engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', set_sqlite_pragmas)
 
-from fast_zero.settings import Settings
 
-engine = create_engine(Settings().DATABASE_URL)
+# The engines are built on first use rather than at import, so importing the
+# app does not load the database driver and tools that never touch the
+# database start faster.
+@cache
+def get_engine() -> Engine:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        **get_pool_options(settings.DATABASE_URL, InstrumentedQueuePool),
+    )
+    use_sqlite_pragmas(engine)
+    return engine
+
+
+@cache
+def get_async_engine() -> AsyncEngine:
+    async_engine = create_async_engine(
+        get_async_url(settings.DATABASE_URL),
+        **get_pool_options(settings.DATABASE_URL, InstrumentedAsyncQueuePool),
+    )
+    use_sqlite_pragmas(async_engine.sync_engine)
+    return async_engine
+
+
+@cache
+def get_async_sessionmaker() -> async_sessionmaker:
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False)
+
+
+def get_active_pool():
+    return get_async_engine().pool if settings.DATABASE_ASYNC else get_engine().pool
+
+
+def pool_stat(method: str):
+    """Read ``method`` of the active pool. The pools of in-memory SQLite have no size and report 0."""
+
+    def read() -> int:
+        pool = get_active_pool()
+        return getattr(pool, method)() if isinstance(pool, QueuePool) else 0
+
+    return read
+
+
+registry.gauge('db_pool_size', 'Connections the pool keeps open.', pool_stat('size'))
+registry.gauge('db_pool_checked_out', 'Connections currently in use.', pool_stat('checkedout'))
+registry.gauge('db_pool_checked_in', 'Idle connections in the pool.', pool_stat('checkedin'))
+registry.gauge('db_pool_overflow', 'Connections opened beyond DATABASE_POOL_SIZE.', pool_stat('overflow'))
+
+
+class ThreadedSession:
+    """A blocking ``Session`` driven through the ``AsyncSession`` interface.
+
+    Every call that talks to the database runs on the threadpool, which is
+    how the routers behaved before they were ``async def``. It is used when
+    ``DATABASE_ASYNC`` is off so both paths can be benchmarked.
+    """
+
+    blocking_methods = frozenset({
+        'commit',
+        'delete',
+        'execute',
+        'flush',
+        'get',
+        'refresh',
+        'rollback',
+        'scalar',
+        'scalars',
+    })
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def __getattr__(self, name):
+        attr = getattr(self.sync_session, name)
+        if name in self.blocking_methods:
+            return partial(run_in_threadpool, attr)
+        return attr
+
+    async def stream_scalars(self, statement, **kwargs):
+        return ThreadedResult(await run_in_threadpool(self.sync_session.scalars, statement, **kwargs))
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class ThreadedResult:
+    """Iterate a blocking ``Result`` the way ``AsyncResult`` is iterated."""
+
+    def __init__(self, result):
+        self.result = result
+
+    async def partitions(self, size: int | None = None):
+        partitions = self.result.partitions(size)
+        while partition := await run_in_threadpool(next, partitions, None):
+            yield partition
 
 
 def get_session():  # pragma: no cover
-    with Session(engine) as session:
+    with Session(get_engine()) as session:
+        yield session
+
+
+def new_async_session():
+    if settings.DATABASE_ASYNC:
+        return get_async_sessionmaker()()
+    return ThreadedSession(Session(get_engine(), expire_on_commit=False))
+
+
+def get_session_factory():  # pragma: no cover
+    """Hand out ``new_async_session`` for work that outlives the request scope.
+
+    Sessions from ``get_async_session`` are closed before a streaming body
+    is sent, so streaming responses open their own.
+    """
+    return new_async_session
+
+
+async def get_async_session():  # pragma: no cover
+    async with new_async_session() as session:
         yield session
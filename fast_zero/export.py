@@ -0,0 +1,53 @@
+import csv
+from io import StringIO
+from typing import Literal
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+ExportFormat = Literal['ndjson', 'csv']
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def encode_csv(rows) -> str:
+    buffer = StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+async def stream_export(session_factory, query, schema: type[BaseModel], format: ExportFormat):
+    if format == 'csv':
+        yield encode_csv([schema.model_fields])
+
+    async with session_factory() as session:
+        result = await session.stream_scalars(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+
+        async for partition in result.partitions():
+            items = [schema.model_validate(row, from_attributes=True) for row in partition]
+
+            if format == 'csv':
+                yield encode_csv(item.model_dump(mode='json').values() for item in items)
+            else:
+                yield ''.join(f'{item.model_dump_json()}\n' for item in items)
+
+
+def export_response(session_factory, query, schema: type[BaseModel], format: ExportFormat, filename: str):
+    """Stream every row of ``query`` as NDJSON or CSV.
+
+    Rows are fetched ``EXPORT_BATCH_SIZE`` at a time from a server-side
+    cursor and encoded batch by batch, so memory stays flat however large
+    the table is.
+    """
+    return StreamingResponse(
+        stream_export(session_factory, query, schema, format),
+        media_type=MEDIA_TYPES[format],
+        headers={'Content-Disposition': f'attachment; filename="{filename}.{format}"'},
+    )
@@ -0,0 +1,214 @@
+"""Load patients and clinical records from CSV or JSON Lines files.
+
+Usage: ``python -m fast_zero.importer patients clinic.csv``
+
+The file is read one row at a time and written ``BULK_CHUNK_SIZE`` rows per
+transaction. After every chunk the number of rows consumed so far is saved
+to ``<file>.checkpoint``, so an interrupted run picks up where it stopped.
+Rows that fail validation or that the database rejects go to
+``<file>.rejects.jsonl`` with their row number and the reason.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+from itertools import batched, islice
+from pathlib import Path
+from typing import Literal, TextIO
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.crud import insert_chunk, validate_items
+from fast_zero.database import new_async_session
+from fast_zero.models import (
+    ClinicalExamination,
+    ClinicalHistory,
+    ComplementaryExam,
+    Patient,
+    PhysiotherapyDiagosis,
+    Prognosis,
+    TreatmentPlan,
+)
+from fast_zero.schemas import (
+    ClinicalExaminationSchema,
+    ClinicalHistorySchema,
+    ComplementaryExamsSchema,
+    ImportReport,
+    PatientSchema,
+    PhysiotherapyDiagnosisSchema,
+    PrognosisSchema,
+    TreatmentPlanSchema,
+)
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+ImportFormat = Literal['csv', 'jsonl']
+
+IMPORT_RESOURCES = {
+    'patients': (Patient, PatientSchema),
+    'clinical-history': (ClinicalHistory, ClinicalHistorySchema),
+    'clinical-examination': (ClinicalExamination, ClinicalExaminationSchema),
+    'complementary-exams': (ComplementaryExam, ComplementaryExamsSchema),
+    'physiotherapy-diagnosis': (PhysiotherapyDiagosis, PhysiotherapyDiagnosisSchema),
+    'prognosis': (Prognosis, PrognosisSchema),
+    'treatment-plan': (TreatmentPlan, TreatmentPlanSchema),
+}
+
+
+def guess_format(filename: str) -> ImportFormat:
+    return 'csv' if Path(filename).suffix.lower() == '.csv' else 'jsonl'
+
+
+def read_rows(stream: TextIO, format: ImportFormat) -> Iterator:
+    """Yield one item per row of ``stream``.
+
+    Empty CSV cells become ``None``. A JSON line that does not parse is
+    yielded as the raw string, so validation rejects it like any other bad
+    row instead of aborting the import.
+    """
+    if format == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value or None for key, value in row.items()}
+        return
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield line.rstrip('\n')
+
+
+def read_batch(batches: Iterator, schema):
+    """The next batch of rows with its validation result, or ``None`` once ``batches`` is exhausted."""
+    batch = next(batches, None)
+    if batch is None:
+        return None
+    return batch, validate_items(schema, batch)
+
+
+class ImportLog:
+    """Receives rejected rows and checkpoints while an import runs; this one discards them."""
+
+    def reject(self, row: int, item, detail):
+        pass
+
+    def checkpoint(self, processed: int):
+        pass
+
+
+class FileImportLog(ImportLog):
+    def __init__(self, rejects: TextIO, checkpoint: Path):
+        self.rejects = rejects
+        self.checkpoint_path = checkpoint
+
+    def reject(self, row: int, item, detail):
+        self.rejects.write(json.dumps({'row': row, 'item': item, 'detail': detail}, default=str) + '\n')
+
+    def checkpoint(self, processed: int):
+        self.rejects.flush()
+        partial = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        partial.write_text(json.dumps({'processed': processed}), encoding='utf-8')
+        os.replace(partial, self.checkpoint_path)
+
+
+async def import_rows(
+    session: AsyncSession,
+    resource: str,
+    rows: Iterable,
+    skip: int = 0,
+    log: ImportLog | None = None,
+) -> ImportReport:
+    """Insert ``rows`` into ``resource`` a chunk at a time, skipping the first ``skip`` rows.
+
+    ``log.checkpoint`` receives the number of rows consumed once every row up
+    to it is either committed or rejected. A crash while a failed chunk is
+    being retried row by row can make a resumed run insert part of that
+    chunk again.
+
+    Reading, parsing and validating each chunk happen in the threadpool, so a
+    large import does not hold up the event loop between commits.
+    """
+    model, schema = IMPORT_RESOURCES[resource]
+    log = log or ImportLog()
+    report = ImportReport(processed=skip)
+    started = time.perf_counter()
+
+    batches = batched(islice(rows, skip, None), settings.BULK_CHUNK_SIZE)
+    while parsed := await run_in_threadpool(read_batch, batches, schema):
+        batch, (valid, validated, errors) = parsed
+        await insert_chunk(session, model, list(zip(valid, validated)), {}, errors)
+
+        for error in sorted(errors, key=lambda error: error['index']):
+            log.reject(report.processed + error['index'] + 1, batch[error['index']], error['detail'])
+
+        report.imported += len(batch) - len(errors)
+        report.rejected += len(errors)
+        report.processed += len(batch)
+
+        log.checkpoint(report.processed)
+
+    report.seconds = time.perf_counter() - started
+    if report.seconds:
+        report.rows_per_second = (report.imported + report.rejected) / report.seconds
+
+    return report
+
+
+def read_checkpoint(path: Path) -> int:
+    if not path.exists():
+        return 0
+    return json.loads(path.read_text(encoding='utf-8'))['processed']
+
+
+async def import_file(resource: str, source: Path, format: ImportFormat, restart: bool = False) -> ImportReport:
+    checkpoint = source.with_name(source.name + '.checkpoint')
+    rejects = source.with_name(source.name + '.rejects.jsonl')
+    skip = 0 if restart else read_checkpoint(checkpoint)
+
+    with (
+        source.open(encoding='utf-8', newline='') as stream,
+        rejects.open('a' if skip else 'w', encoding='utf-8') as rejects_file,
+    ):
+        async with new_async_session() as session:
+            report = await import_rows(
+                session,
+                resource,
+                read_rows(stream, format),
+                skip=skip,
+                log=FileImportLog(rejects_file, checkpoint),
+            )
+
+    checkpoint.unlink(missing_ok=True)
+    return report
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m fast_zero.importer', description=__doc__.splitlines()[0])
+    parser.add_argument('resource', choices=IMPORT_RESOURCES)
+    parser.add_argument('source', type=Path)
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='defaults to the file extension')
+    parser.add_argument('--restart', action='store_true', help='ignore any saved checkpoint')
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        import_file(args.resource, args.source, args.format or guess_format(args.source.name), args.restart)
+    )
+
+    print(
+        f'{report.imported} rows imported, {report.rejected} rejected '
+        f'in {report.seconds:.1f}s ({report.rows_per_second:.0f} rows/s)'
+    )
+    if report.rejected:
+        print(f'Rejected rows were written to {args.source.name}.rejects.jsonl')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+from bisect import bisect_left
+from threading import Lock
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self._lock = Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self):
+        yield self.name, '', self.value
+
+
+class Gauge:
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def samples(self):
+        yield self.name, '', self.callback()
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{self.name}_bucket', f'{{le="{bound}"}}', cumulative
+        yield f'{self.name}_bucket', '{le="+Inf"}', self.count
+        yield f'{self.name}_sum', '', self.sum
+        yield f'{self.name}_count', '', self.count
+
+
+class Registry:
+    """Process-wide metrics rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self.register(Counter(name, documentation))
+
+    def gauge(self, name: str, documentation: str, callback) -> Gauge:
+        return self.register(Gauge(name, documentation, callback))
+
+    def histogram(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(f'{name}{labels} {value}' for name, labels, value in metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
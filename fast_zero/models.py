@@ -1,7 +1,9 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, func
-from sqlalchemy.orm import Mapped, mapped_column, registry
+from sqlalchemy import DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
+
+from fast_zero.search import SearchIndex
 
 table_registry = registry()
 
@@ -17,6 +19,32 @@ class User:
     created_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
 
 
+@table_registry.mapped_as_dataclass
+class RefreshToken:
+    __tablename__ = 'refresh_tokens'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), index=True)
+    # HMAC of the token; the token itself is only ever known to the client.
+    token_hash: Mapped[str] = mapped_column(unique=True)
+    # Every token rotated out of the same login shares a family.
+    family: Mapped[str] = mapped_column(index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
+    created_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
+
+
+@table_registry.mapped_as_dataclass
+class RevokedToken:
+    __tablename__ = 'revoked_tokens'
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    jti: Mapped[str] = mapped_column(unique=True)
+    # Rows are only needed until the token would have expired anyway.
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    revoked_at: Mapped[datetime] = mapped_column(init=False, server_default=func.now())
+
+
 @table_registry.mapped_as_dataclass
 class Patient:
     __tablename__ = 'patients'
@@ -31,10 +59,33 @@ class Patient:
     residential_address: Mapped[str]
     commercial_address: Mapped[str]
 
+    # Clinical records are only loaded when a query asks for them with an
+    # eager loader (see the patient chart). Responses are built from every
+    # dataclass field, so a lazy load here would fire once per patient.
+    clinical_histories: Mapped[list['ClinicalHistory']] = relationship(
+        init=False, repr=False, viewonly=True, lazy='noload', order_by='ClinicalHistory.history_id'
+    )
+    clinical_examinations: Mapped[list['ClinicalExamination']] = relationship(
+        init=False, repr=False, viewonly=True, lazy='noload', order_by='ClinicalExamination.exam_id'
+    )
+    complementary_exams: Mapped[list['ComplementaryExam']] = relationship(
+        init=False, repr=False, viewonly=True, lazy='noload', order_by='ComplementaryExam.exam_id'
+    )
+    physiotherapy_diagnosis: Mapped[list['PhysiotherapyDiagosis']] = relationship(
+        init=False, repr=False, viewonly=True, lazy='noload', order_by='PhysiotherapyDiagosis.diagnosis_id'
+    )
+    prognosis: Mapped[list['Prognosis']] = relationship(
+        init=False, repr=False, viewonly=True, lazy='noload', order_by='Prognosis.prognosis_id'
+    )
+    treatment_plans: Mapped[list['TreatmentPlan']] = relationship(
+        init=False, repr=False, viewonly=True, lazy='noload', order_by='TreatmentPlan.plan_id'
+    )
+
 
 @table_registry.mapped_as_dataclass
 class ClinicalHistory:
     __tablename__ = 'clinical_histories'
+    __table_args__ = (Index('ix_clinical_histories_patient_id_history_id', 'patient_id', 'history_id'),)
 
     history_id: Mapped[int] = mapped_column(init=False, primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey('patients.id'))
@@ -49,6 +100,7 @@ class ClinicalHistory:
 @table_registry.mapped_as_dataclass
 class ClinicalExamination:
     __tablename__ = 'clinical_examinations'
+    __table_args__ = (Index('ix_clinical_examinations_patient_id_exam_id', 'patient_id', 'exam_id'),)
 
     exam_id: Mapped[int] = mapped_column(init=False, primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey('patients.id'))
@@ -58,6 +110,7 @@ class ClinicalExamination:
 @table_registry.mapped_as_dataclass
 class ComplementaryExam:
     __tablename__ = 'complementary_exams'
+    __table_args__ = (Index('ix_complementary_exams_patient_id_exam_id', 'patient_id', 'exam_id'),)
 
     exam_id: Mapped[int] = mapped_column(init=False, primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey('patients.id'))
@@ -67,6 +120,7 @@ class ComplementaryExam:
 @table_registry.mapped_as_dataclass
 class PhysiotherapyDiagosis:
     __tablename__ = 'physiotherapy_diagnosis'
+    __table_args__ = (Index('ix_physiotherapy_diagnosis_patient_id_diagnosis_id', 'patient_id', 'diagnosis_id'),)
 
     diagnosis_id: Mapped[int] = mapped_column(init=False, primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey('patients.id'))
@@ -76,6 +130,7 @@ class PhysiotherapyDiagosis:
 @table_registry.mapped_as_dataclass
 class Prognosis:
     __tablename__ = 'prognosis'
+    __table_args__ = (Index('ix_prognosis_patient_id_prognosis_id', 'patient_id', 'prognosis_id'),)
 
     prognosis_id: Mapped[int] = mapped_column(init=False, primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey('patients.id'))
@@ -85,9 +140,22 @@ class Prognosis:
 @table_registry.mapped_as_dataclass
 class TreatmentPlan:
     __tablename__ = 'treatments_plan'
+    __table_args__ = (Index('ix_treatments_plan_patient_id_plan_id', 'patient_id', 'plan_id'),)
 
     plan_id: Mapped[int] = mapped_column(init=False, primary_key=True)
     patient_id: Mapped[int] = mapped_column(ForeignKey('patients.id'))
     objectives: Mapped[str]
     probable_sessions: Mapped[int]
     procedures: Mapped[str]
+
+
+SEARCH_INDEXES = {
+    'clinical-history': SearchIndex(ClinicalHistory.__table__, ('main_complaint', 'disease_history')),
+    'clinical-examination': SearchIndex(ClinicalExamination.__table__, ('exam_details',)),
+    'complementary-exams': SearchIndex(ComplementaryExam.__table__, ('exam_details',)),
+    'physiotherapy-diagnosis': SearchIndex(PhysiotherapyDiagosis.__table__, ('diagnosis_details',)),
+    'prognosis': SearchIndex(Prognosis.__table__, ('prognosis_details',)),
+    'treatment-plan': SearchIndex(TreatmentPlan.__table__, ('objectives', 'procedures')),
+}
+for search_index in SEARCH_INDEXES.values():
+    search_index.listen_for_ddl()
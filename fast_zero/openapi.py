@@ -0,0 +1,68 @@
+"""The OpenAPI document, generated once per process and served from memory.
+
+FastAPI builds the schema on the first request to ``/openapi.json``, which
+stalls that request in every fresh worker. The app builds it at startup
+instead, or reads it from ``OPENAPI_SCHEMA_FILE`` when the file was written
+at build time::
+
+    python -m fast_zero.openapi openapi.json
+"""
+
+import argparse
+import gzip
+import hashlib
+import importlib
+import json
+from pathlib import Path
+
+from fastapi import FastAPI
+
+
+class OpenAPIDocument:
+    """The schema as JSON bytes, its gzip encoding and an ETag for each."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        # mtime=0 keeps the compressed bytes identical across workers and restarts.
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # CompressionMiddleware may still re-encode the plain body, so its tag is weak.
+        self.etag = f'W/"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+    @classmethod
+    def from_app(cls, app: FastAPI) -> 'OpenAPIDocument':
+        return cls(render(app))
+
+
+def render(app: FastAPI) -> bytes:
+    return json.dumps(app.openapi(), ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def load_openapi(app: FastAPI, schema_file: str | None = None) -> OpenAPIDocument:
+    """Return the app's document, reading ``schema_file`` when it exists and generating it otherwise."""
+    document = getattr(app.state, 'openapi_document', None)
+    if document is None:
+        if schema_file and Path(schema_file).exists():
+            document = OpenAPIDocument(Path(schema_file).read_bytes())
+        else:
+            document = OpenAPIDocument.from_app(app)
+        app.state.openapi_document = document
+    return document
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m fast_zero.openapi', description=__doc__.splitlines()[0])
+    parser.add_argument('output', type=Path, nargs='?', default=Path('openapi.json'))
+    parser.add_argument('--app', default='fast_zero.app:app', help='the application, as module:attribute')
+    args = parser.parse_args(argv)
+
+    module, _, attribute = args.app.partition(':')
+    app = getattr(importlib.import_module(module), attribute)
+
+    args.output.write_bytes(render(app))
+    print(f'Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
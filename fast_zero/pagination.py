@@ -0,0 +1,69 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import Select, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+
+def encode_cursor(pk: int) -> str:
+    return urlsafe_b64encode(f'pk:{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        prefix, pk = urlsafe_b64decode(cursor.encode()).decode().split(':')
+        if prefix != 'pk':
+            raise ValueError(prefix)
+        return int(pk)
+    except (BinasciiError, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail='Invalid cursor.')
+
+
+def page_size(limit: int | None) -> int:
+    if limit is None or limit < 1:
+        return settings.PAGE_SIZE_DEFAULT
+    return min(limit, settings.PAGE_SIZE_MAX)
+
+
+def select_rows(model, names=None) -> Select:
+    """SELECT the mapped columns of ``model``, or only those in ``names``, as plain rows.
+
+    Rows are tuples with attribute access. Unlike mapped instances they are
+    not tracked by the session, carry no instrumentation and set up no
+    relationship collections, so read-only listings use them.
+    """
+    return select(
+        *(getattr(model, attr.key) for attr in inspect(model).column_attrs if names is None or attr.key in names)
+    )
+
+
+def selects_entity(query: Select) -> bool:
+    description = query.column_descriptions[0]
+    return len(query.column_descriptions) == 1 and description['expr'] is description['entity']
+
+
+async def fetch_page(session: AsyncSession, query, pk_column, after: str | None, limit: int | None):
+    """Run ``query`` as one keyset page ordered by ``pk_column``.
+
+    Seeking past the last primary key seen costs the same on every page,
+    unlike an offset. Returns the rows, or the mapped instances when
+    ``query`` selects an entity, and the cursor of the next page, or
+    ``None`` when this is the last one.
+    """
+    limit = page_size(limit)
+
+    if after is not None:
+        query = query.where(pk_column > decode_cursor(after))
+
+    result = await session.execute(query.order_by(pk_column).limit(limit + 1))
+    rows = result.scalars().all() if selects_entity(query) else result.all()
+
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(getattr(rows[limit - 1], pk_column.key))
+    return rows, None
@@ -0,0 +1,89 @@
+"""Argon2 hashing, kept free of app imports so pool workers start quickly.
+
+Run ``python -m fast_zero.passwords`` to measure this host and print the
+``ARGON2_*`` settings that make one hash take about ``--target-ms``.
+"""
+
+import argparse
+import importlib
+import statistics
+import time
+from functools import cache
+
+
+# pwdlib and argon2 are imported on the first hash, which keeps them off the app's import path.
+@cache
+def get_pwd_context():
+    return importlib.import_module('pwdlib').PasswordHash.recommended()
+
+
+def argon2_hasher(time_cost: int, memory_cost: int, parallelism: int):
+    hasher_class = importlib.import_module('pwdlib.hashers.argon2').Argon2Hasher
+    return hasher_class(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def configure(time_cost: int, memory_cost: int, parallelism: int):
+    """Hash with these Argon2 costs from now on. Existing hashes keep verifying."""
+    pwd_context = get_pwd_context()
+    pwd_context.current_hasher = argon2_hasher(time_cost, memory_cost, parallelism)
+    pwd_context.hashers = (pwd_context.current_hasher,)
+
+
+def hash_password(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether the hash was made with other parameters than the current ones."""
+    hasher = get_pwd_context().current_hasher
+    return not hasher.identify(hashed_password) or hasher.check_needs_rehash(hashed_password)
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, rounds: int = 3) -> float:
+    """Median seconds one hash takes with these costs."""
+    hasher = argon2_hasher(time_cost, memory_cost, parallelism)
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.hash('calibration password')
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(target: float, memory_cost: int, parallelism: int, max_time_cost: int = 10) -> tuple[int, float]:
+    """Highest time cost, given ``memory_cost``, whose hash still fits in ``target`` seconds.
+
+    Memory is what makes Argon2 expensive to attack, so it is fixed first
+    and the number of passes is raised until the target is reached.
+    """
+    best = (1, measure(1, memory_cost, parallelism))
+    for time_cost in range(2, max_time_cost + 1):
+        elapsed = measure(time_cost, memory_cost, parallelism)
+        if elapsed > target:
+            break
+        best = (time_cost, elapsed)
+    return best
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='python -m fast_zero.passwords', description='Calibrate Argon2 costs.')
+    parser.add_argument('--target-ms', type=float, default=100, help='hash time to aim for (default: 100)')
+    parser.add_argument('--memory-mib', type=int, default=64, help='memory per hash (default: 64)')
+    parser.add_argument('--parallelism', type=int, default=4, help='lanes per hash (default: 4)')
+    args = parser.parse_args(argv)
+
+    memory_cost = args.memory_mib * 1024
+    time_cost, elapsed = calibrate(args.target_ms / 1000, memory_cost, args.parallelism)
+
+    print(f'# one hash takes {elapsed * 1000:.0f} ms on this host; add to .env:')
+    print(f'ARGON2_TIME_COST={time_cost}')
+    print(f'ARGON2_MEMORY_COST={memory_cost}')
+    print(f'ARGON2_PARALLELISM={args.parallelism}')
+
+
+if __name__ == '__main__':
+    main()
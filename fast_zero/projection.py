@@ -0,0 +1,75 @@
+"""Column projection for the ``fields=`` query parameter.
+
+A list or chart request may name the fields it wants, and only those
+columns are selected. The primary key is always selected so a page can
+carry its cursor. Without ``fields``, list pages leave out the large free
+text columns and send the first ``TEXT_PREVIEW_LENGTH`` characters of each
+as ``<column>_preview`` instead. The database cuts the preview, so the
+full text is never read into the app.
+"""
+
+from http import HTTPStatus
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func, inspect
+
+from fast_zero.pagination import select_rows
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+PREVIEW_SUFFIX = '_preview'
+
+
+def split_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return []
+    return list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+
+
+def reject_unknown_fields(unknown: list[str]):
+    if unknown:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f'Unknown field: {", ".join(unknown)}.')
+
+
+def parse_fields(fields: str | None, schema) -> list[str] | None:
+    """The fields of ``schema`` named in ``fields``, or ``None`` when none are named."""
+    names = split_fields(fields)
+    reject_unknown_fields([name for name in names if name not in schema.model_fields])
+    return names or None
+
+
+def preview_columns(model, schema) -> list[str]:
+    """The columns of ``model`` that ``schema`` has a preview field for."""
+    columns = {attr.key for attr in inspect(model).column_attrs}
+    return [
+        name.removesuffix(PREVIEW_SUFFIX)
+        for name in schema.model_fields
+        if name.endswith(PREVIEW_SUFFIX) and name.removesuffix(PREVIEW_SUFFIX) in columns
+    ]
+
+
+def default_fields(model, schema, previews: bool) -> list[str]:
+    """Every column ``schema`` exposes, with previews in place of the large ones when ``previews`` is set."""
+    large = preview_columns(model, schema) if previews else []
+    columns = [attr.key for attr in inspect(model).column_attrs if attr.key in schema.model_fields]
+    return [name for name in columns if name not in large] + [name + PREVIEW_SUFFIX for name in large]
+
+
+def select_fields(model, schema, pk_column, fields: list[str] | None, previews: bool = True) -> Select:
+    """SELECT ``fields`` of ``model`` and its primary key as plain rows.
+
+    With ``fields`` set to ``None`` the default fields are selected; see
+    ``default_fields``.
+    """
+    if fields is None:
+        fields = default_fields(model, schema, previews)
+
+    query = select_rows(model, {*fields, pk_column.key})
+    previews = [
+        func.substr(getattr(model, name), 1, settings.TEXT_PREVIEW_LENGTH).label(name + PREVIEW_SUFFIX)
+        for name in preview_columns(model, schema)
+        if name + PREVIEW_SUFFIX in fields
+    ]
+
+    return query.add_columns(*previews)
@@ -0,0 +1,97 @@
+"""In-process rate limits for the endpoints that run Argon2.
+
+Each limiter is a set of token buckets, one per key (client IP or account).
+A bucket holds up to ``per_minute`` tokens and refills continuously at
+``per_minute`` tokens a minute, so the limit applies over any sliding
+minute while still allowing a short burst. Only the ``max_keys`` most
+recently seen keys are remembered; an evicted key starts again with a full
+bucket.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from fast_zero.metrics import Counter, registry
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+
+class TokenBucketLimiter:
+    def __init__(self, per_minute: int, max_keys: int, rejected: Counter):
+        self.per_minute = per_minute
+        self.max_keys = max_keys
+        self.buckets = OrderedDict()
+        self.rejected = rejected
+
+    def acquire(self, key: str) -> float:
+        """Take a token for ``key``; return 0 on success or the seconds until one is available."""
+        if self.per_minute <= 0:
+            return 0
+
+        rate = self.per_minute / 60
+        now = time.monotonic()
+        tokens, updated_at = self.buckets.pop(key, (self.per_minute, now))
+        tokens = min(self.per_minute, tokens + (now - updated_at) * rate)
+
+        if tokens >= 1:
+            self.buckets[key] = (tokens - 1, now)
+            wait = 0
+        else:
+            self.buckets[key] = (tokens, now)
+            wait = (1 - tokens) / rate
+
+        while len(self.buckets) > self.max_keys:
+            self.buckets.popitem(last=False)
+
+        if wait:
+            self.rejected.inc()
+        return wait
+
+    def reset(self):
+        self.buckets.clear()
+
+
+login_ip_rejected = registry.counter('rate_limit_login_ip_rejected_total', 'Requests refused by the login_ip limit.')
+login_account_rejected = registry.counter(
+    'rate_limit_login_account_rejected_total', 'Requests refused by the login_account limit.'
+)
+signup_ip_rejected = registry.counter('rate_limit_signup_ip_rejected_total', 'Requests refused by the signup_ip limit.')
+
+login_ip_limiter = TokenBucketLimiter(
+    settings.LOGIN_RATE_PER_MINUTE_IP, settings.RATE_LIMIT_MAX_KEYS, login_ip_rejected
+)
+login_account_limiter = TokenBucketLimiter(
+    settings.LOGIN_RATE_PER_MINUTE_ACCOUNT, settings.RATE_LIMIT_MAX_KEYS, login_account_rejected
+)
+signup_ip_limiter = TokenBucketLimiter(
+    settings.SIGNUP_RATE_PER_MINUTE_IP, settings.RATE_LIMIT_MAX_KEYS, signup_ip_rejected
+)
+
+
+def enforce(wait: float):
+    if wait:
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many attempts, try again later.',
+            headers={'Retry-After': str(math.ceil(wait))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else 'unknown'
+
+
+def limit_login(request: Request, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
+    # An IP already over its limit does not also use up the account's tokens.
+    enforce(login_ip_limiter.acquire(client_ip(request)) or login_account_limiter.acquire(form_data.username.lower()))
+
+
+def limit_signup(request: Request):
+    enforce(signup_ip_limiter.acquire(client_ip(request)))
@@ -0,0 +1,97 @@
+"""Long-lived refresh tokens that renew access tokens without the password.
+
+Tokens are random strings handed to the client once. Only an HMAC-SHA256
+of each one, keyed with ``SECRET_KEY``, is stored: a leaked table cannot be
+replayed. Unlike the password, the token has full entropy, so a fast keyed
+hash is enough and a lookup costs one indexed query.
+
+Every renewal rotates the token. Presenting a token that was already
+rotated means it leaked, so the whole family descending from that login is
+revoked.
+"""
+
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import RefreshToken
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+
+def hash_refresh_token(token: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+
+async def issue_refresh_token(session: AsyncSession, user_id: int, family: str | None = None) -> str:
+    """Store a new refresh token for ``user_id`` and return it; the caller commits."""
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(tz=ZoneInfo('UTC')) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+
+    await session.execute(
+        insert(RefreshToken).values(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            family=family or secrets.token_hex(16),
+            expires_at=expires_at,
+        )
+    )
+
+    return token
+
+
+async def rotate_refresh_token(session: AsyncSession, token: str) -> tuple[int, str] | None:
+    """Spend ``token`` and issue its successor.
+
+    Returns the user id and the new token, or ``None`` when ``token`` is
+    unknown, expired or already spent.
+    """
+    token_hash = hash_refresh_token(token)
+    now = datetime.now(tz=ZoneInfo('UTC'))
+
+    # Marking the token spent in the same statement that checks it means two
+    # concurrent renewals cannot both succeed.
+    spent = (
+        await session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family)
+        )
+    ).first()
+
+    if spent is None:
+        family = await session.scalar(
+            select(RefreshToken.family).where(
+                RefreshToken.token_hash == token_hash, RefreshToken.revoked_at.is_not(None)
+            )
+        )
+        if family is not None:
+            await revoke_refresh_tokens(session, RefreshToken.family == family)
+        await session.commit()
+        return None
+
+    user_id, family = spent
+    new_token = await issue_refresh_token(session, user_id, family)
+    await session.commit()
+
+    return user_id, new_token
+
+
+async def revoke_refresh_tokens(session: AsyncSession, *criteria):
+    """Revoke every live refresh token matching ``criteria``; the caller commits."""
+    await session.execute(
+        update(RefreshToken)
+        .where(RefreshToken.revoked_at.is_(None), *criteria)
+        .values(revoked_at=datetime.now(tz=ZoneInfo('UTC')))
+    )
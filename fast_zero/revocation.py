@@ -0,0 +1,123 @@
+"""Revoked access tokens, checked on every authenticated request.
+
+Each process keeps a Bloom filter of the ``jti`` of every revoked token
+that has not expired yet. Most tokens were never revoked and the filter
+answers "no" for them without touching the database. A "maybe" is checked
+against the ``revoked_tokens`` table and the answer kept in a small exact
+map until the next refresh. New rows are picked up at most every
+``REVOCATION_REFRESH_SECONDS``, so a logout in another process takes effect
+within that delay. A logout handled by this process takes effect at once.
+
+Ids are not committed in order on every database: a row may become visible
+after one with a higher id. Each refresh therefore reads again the last
+``REVOCATION_REFRESH_OVERLAP`` ids below the highest one seen, not only the
+rows above it.
+"""
+
+import hashlib
+import math
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import RevokedToken
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8])
+        second = int.from_bytes(digest[8:]) | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self.positions(key):
+            self.bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self.positions(key))
+
+
+class RevocationList:
+    def __init__(self, capacity: int, error_rate: float, refresh_interval: float, overlap: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.overlap = overlap
+        self.reset()
+
+    def reset(self):
+        self.bloom = BloomFilter(self.capacity, self.error_rate)
+        # jti -> whether it is revoked, for the tokens the filter could not rule out since the last refresh.
+        self.known = {}
+        self.last_id = 0
+        self.refreshed_at = None
+
+    async def refresh(self, session: AsyncSession):
+        """Add the tokens revoked since the last refresh, or late within the overlap, to the filter."""
+        if self.bloom.count >= self.capacity:
+            # Bloom filters cannot forget; start over with only the unexpired rows.
+            self.reset()
+
+        rows = await session.execute(
+            select(RevokedToken.id, RevokedToken.jti)
+            .where(
+                RevokedToken.id > self.last_id - self.overlap,
+                RevokedToken.expires_at > datetime.now(tz=ZoneInfo('UTC')),
+            )
+            .order_by(RevokedToken.id)
+        )
+        for row_id, jti in rows:
+            # Rows read again are already in the filter; adding them twice would only use up capacity.
+            if jti not in self.bloom:
+                self.bloom.add(jti)
+            self.last_id = max(self.last_id, row_id)
+
+        self.known.clear()
+        self.refreshed_at = time.monotonic()
+
+    async def refresh_if_stale(self, session: AsyncSession):
+        if self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_interval:
+            await self.refresh(session)
+
+    async def is_revoked(self, session: AsyncSession, jti: str) -> bool:
+        if jti in self.known:
+            return self.known[jti]
+        if jti not in self.bloom:
+            return False
+
+        revoked = await session.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti)) is not None
+        self.known[jti] = revoked
+        return revoked
+
+    def remember(self, jti: str):
+        """Treat a committed revocation as revoked in this process at once, without waiting for a refresh."""
+        self.bloom.add(jti)
+        self.known[jti] = True
+
+
+async def revoke(session: AsyncSession, jti: str, expires_at: datetime):
+    """Record ``jti`` as revoked; the caller commits, then calls ``revocation_list.remember``."""
+    await session.execute(insert(RevokedToken).values(jti=jti, expires_at=expires_at))
+
+
+revocation_list = RevocationList(
+    settings.REVOCATION_BLOOM_CAPACITY,
+    settings.REVOCATION_BLOOM_ERROR_RATE,
+    settings.REVOCATION_REFRESH_SECONDS,
+    settings.REVOCATION_REFRESH_OVERLAP,
+)
@@ -1,40 +1,104 @@
+from collections.abc import Callable
+from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero.database import get_session
-from fast_zero.models import User
-from fast_zero.schemas import Token
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.models import RefreshToken, User
+from fast_zero.passwords import needs_rehash
+from fast_zero.ratelimit import limit_login
+from fast_zero.refresh_tokens import (
+    hash_refresh_token,
+    issue_refresh_token,
+    revoke_refresh_tokens,
+    rotate_refresh_token,
+)
+from fast_zero.revocation import revocation_list
+from fast_zero.schemas import Message, RefreshTokenRequest, Token
 from fast_zero.security import (
     create_access_token,
     get_current_user,
-    verify_password,
+    get_password_hasher,
+    oauth2_scheme,
+    rehash_password,
+    revoke_access_token,
 )
 
 router = APIRouter(prefix='/auth', tags=['auth'])
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
 T_OAuth2Form = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 
-@router.post('/token', response_model=Token)
-def login_for_access_token(session: T_Session, form_data: T_OAuth2Form):
-    user = session.scalar(select(User).where(User.email == form_data.username))
+@router.post('/token', response_model=Token, dependencies=[Depends(limit_login)])
+async def login_for_access_token(
+    session: T_Session,
+    session_factory: T_SessionFactory,
+    form_data: T_OAuth2Form,
+    background_tasks: BackgroundTasks,
+):
+    user = await session.scalar(select(User).where(User.email == form_data.username))
 
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await get_password_hasher().verify(form_data.password, user.password):
         raise HTTPException(status_code=400, detail='Incorrect email or password')
 
+    if needs_rehash(user.password):
+        background_tasks.add_task(rehash_password, session_factory, user.id, form_data.password, user.password)
+
     access_token = create_access_token(data={'sub': user.email})
+    refresh_token = await issue_refresh_token(session, user.id)
+    await session.commit()
+
+    return {'access_token': access_token, 'token_type': 'Bearer', 'refresh_token': refresh_token}
+
+
+@router.post('/refresh', response_model=Token)
+async def renew_access_token(body: RefreshTokenRequest, session: T_Session):
+    rotated = await rotate_refresh_token(session, body.refresh_token)
 
-    return {'access_token': access_token, 'token_type': 'Bearer'}
+    if not rotated:
+        raise HTTPException(
+            status_code=HTTPStatus.UNAUTHORIZED,
+            detail='Could not validate credentials',
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+    user_id, refresh_token = rotated
+    email = await session.scalar(select(User.email).where(User.id == user_id))
+    access_token = create_access_token(data={'sub': email})
+
+    return {'access_token': access_token, 'token_type': 'Bearer', 'refresh_token': refresh_token}
 
 
 @router.post('/refresh_token', response_model=Token)
-def refresh_access_token(
+async def refresh_access_token(
     user: User = Depends(get_current_user),
 ):
     new_access_token = create_access_token(data={'sub': user.email})
 
     return {'access_token': new_access_token, 'token_type': 'bearer'}
+
+
+@router.post('/logout', response_model=Message)
+async def logout(
+    session: T_Session,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    user: Annotated[User, Depends(get_current_user)],
+    body: RefreshTokenRequest | None = None,
+):
+    jti = await revoke_access_token(session, token)
+    if body:
+        await revoke_refresh_tokens(
+            session,
+            RefreshToken.user_id == user.id,
+            RefreshToken.token_hash == hash_refresh_token(body.refresh_token),
+        )
+    await session.commit()
+    if jti:
+        revocation_list.remember(jti)
+
+    return {'message': 'Logged out'}
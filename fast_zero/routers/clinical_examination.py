@@ -1,11 +1,20 @@
-from http import HTTPStatus
-from typing import Annotated
+from collections.abc import Callable
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import ClinicalExamination
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
 from fast_zero.schemas import (
+    BulkResult,
+    ClinicalExaminationFields,
     ClinicalExaminationFilter,
     ClinicalExaminationList,
     ClinicalExaminationPublic,
@@ -14,78 +23,92 @@ from fast_zero.schemas import (
     Message,
     PatientFilter,
 )
-from fast_zero.security import get_session
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/clinical-examination', tags=['clinical-examination'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
 CurrentPatient = Annotated[PatientFilter, Depends()]
 
 
 @router.post('/', response_model=ClinicalExaminationPublic)
-def create_clinical_examination(
+async def create_clinical_examination(
     clinical_examination: ClinicalExaminationSchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_clinic_examination = ClinicalExamination(
         patient_id=clinical_examination.patient_id,
         exam_details=clinical_examination.exam_details,
     )
 
-    session.add(db_clinic_examination)
-    session.commit()
-    session.refresh(db_clinic_examination)
+    return await save(db_clinic_examination, session, coalescer)
 
-    return db_clinic_examination
+
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_clinical_examination(
+    items: Annotated[list[Any], Body()],
+    session: T_Session,
+):
+    return await bulk_insert(session, ClinicalExamination, ClinicalExaminationSchema, items)
 
 
-@router.get('/', response_model=ClinicalExaminationList)
-def list_clinical_examinations(
+@router.get('/', response_model=ClinicalExaminationList, response_model_exclude_unset=True)
+async def list_clinical_examinations(
     session: T_Session,
     filters: ClinicalExaminationFilter = Depends(),
 ):
-    query = session.query(ClinicalExamination)
+    fields = parse_fields(filters.fields, ClinicalExaminationFields)
+    query = select_fields(ClinicalExamination, ClinicalExaminationFields, ClinicalExamination.exam_id, fields)
 
+    if filters.patient_id:
+        query = query.filter(ClinicalExamination.patient_id == filters.patient_id)
     if filters.exam_details:
         query = query.filter(ClinicalExamination.exam_details.ilike(f'%{filters.exam_details}%'))
 
-    clinical_examinations = query.all()
+    clinical_examinations, next_cursor = await fetch_page(
+        session, query, ClinicalExamination.exam_id, filters.after, filters.limit
+    )
+
+    return render(
+        ClinicalExaminationList,
+        {'clinical_examinations': clinical_examinations, 'next_cursor': next_cursor},
+        exclude_unset=True,
+    )
+
+
+@router.get('/export')
+async def export_clinical_examinations(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+    patient_id: int | None = None,
+):
+    query = select(ClinicalExamination).order_by(ClinicalExamination.exam_id)
 
-    return {'clinical_examinations': clinical_examinations}
+    if patient_id:
+        query = query.filter(ClinicalExamination.patient_id == patient_id)
+
+    return export_response(session_factory, query, ClinicalExaminationPublic, format, 'clinical_examinations')
 
 
 @router.delete('/{exam_id}', response_model=Message)
-def delete_clinical_examination(
+async def delete_clinical_examination(
     exam_id: int,
     session: T_Session,
 ):
-    clinical_examination = session.query(ClinicalExamination).filter_by(exam_id=exam_id).first()
-
-    if not clinical_examination:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Exam not found.')
-
-    session.delete(clinical_examination)
-    session.commit()
+    await delete_by_pk(session, ClinicalExamination, exam_id, 'Exam not found.')
 
     return {'message': 'Clinical Examination has been deleted successfully.'}
 
 
 @router.patch('/{exam_id}', response_model=ClinicalExaminationPublic)
-def patch_clinical_examination(
+async def patch_clinical_examination(
     exam_id: int,
     clinical_examination: ClinicalExaminationUpdate,
     session: T_Session,
 ):
-    db_clinical_examination = session.query(ClinicalExamination).filter_by(exam_id=exam_id).first()
-
-    if not db_clinical_examination:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Exam not found.')
-
-    for key, value in clinical_examination.model_dump(exclude_unset=True).items():
-        setattr(db_clinical_examination, key, value)
-
-    session.add(db_clinical_examination)
-    session.commit()
-    session.refresh(db_clinical_examination)
-
-    return db_clinical_examination
+    return await update_returning(
+        session, ClinicalExamination, exam_id, clinical_examination.model_dump(exclude_unset=True), 'Exam not found.'
+    )
@@ -1,12 +1,20 @@
-from http import HTTPStatus
-from typing import Annotated
+from collections.abc import Callable
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero.database import get_session
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import ClinicalHistory
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
 from fast_zero.schemas import (
+    BulkResult,
+    ClinicalHistoryFields,
     ClinicalHistoryFilter,
     ClinicalHistoryList,
     ClinicalHistoryPublic,
@@ -15,17 +23,21 @@ from fast_zero.schemas import (
     Message,
     PatientFilter,
 )
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/clinical-history', tags=['clinical-history'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
 CurrentPatient = Annotated[PatientFilter, Depends()]
 
 
 @router.post('/', response_model=ClinicalHistoryPublic)
-def create_clinical_history(
+async def create_clinical_history(
     clinical_history: ClinicalHistorySchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_clinical_history = ClinicalHistory(
         patient_id=clinical_history.patient_id,
@@ -36,20 +48,28 @@ def create_clinical_history(
         personal_family_history=clinical_history.personal_family_history,
         other_information=clinical_history.other_information,
     )
-    session.add(db_clinical_history)
-    session.commit()
-    session.refresh(db_clinical_history)
 
-    return db_clinical_history
+    return await save(db_clinical_history, session, coalescer)
 
 
-@router.get('/', response_model=ClinicalHistoryList)
-def list_clinical_histories(
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_clinical_history(
+    items: Annotated[list[Any], Body()],
+    session: T_Session,
+):
+    return await bulk_insert(session, ClinicalHistory, ClinicalHistorySchema, items)
+
+
+@router.get('/', response_model=ClinicalHistoryList, response_model_exclude_unset=True)
+async def list_clinical_histories(
     session: T_Session,
     filters: ClinicalHistoryFilter = Depends(),
 ):
-    query = session.query(ClinicalHistory)
+    fields = parse_fields(filters.fields, ClinicalHistoryFields)
+    query = select_fields(ClinicalHistory, ClinicalHistoryFields, ClinicalHistory.history_id, fields)
 
+    if filters.patient_id:
+        query = query.filter(ClinicalHistory.patient_id == filters.patient_id)
     if filters.main_complaint:
         query = query.filter(ClinicalHistory.main_complaint.ilike(f'%{filters.main_complaint}%'))
     if filters.disease_history:
@@ -63,41 +83,49 @@ def list_clinical_histories(
     if filters.other_information:
         query = query.filter(ClinicalHistory.other_information.ilike(f'%{filters.other_information}%'))
 
-    return {'clinical_histories': query.all()}
+    clinical_histories, next_cursor = await fetch_page(
+        session, query, ClinicalHistory.history_id, filters.after, filters.limit
+    )
+
+    return render(
+        ClinicalHistoryList, {'clinical_histories': clinical_histories, 'next_cursor': next_cursor}, exclude_unset=True
+    )
+
+
+@router.get('/export')
+async def export_clinical_histories(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+    patient_id: int | None = None,
+):
+    query = select(ClinicalHistory).order_by(ClinicalHistory.history_id)
+
+    if patient_id:
+        query = query.filter(ClinicalHistory.patient_id == patient_id)
+
+    return export_response(session_factory, query, ClinicalHistoryPublic, format, 'clinical_histories')
 
 
 @router.delete('/{history_id}', response_model=Message)
-def delete_clinical_history(
+async def delete_clinical_history(
     history_id: int,
     session: T_Session,
 ):
-    clinical_history = session.query(ClinicalHistory).filter_by(history_id=history_id).first()
-
-    if not clinical_history:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Clinical History not found.')
-
-    session.delete(clinical_history)
-    session.commit()
+    await delete_by_pk(session, ClinicalHistory, history_id, 'Clinical History not found.')
 
     return {'message': 'Clinical History has been deleted successfully.'}
 
 
 @router.patch('/{history_id}', response_model=ClinicalHistoryPublic)
-def patch_clinical_history(
+async def patch_clinical_history(
     history_id: int,
     clinical_history: ClinicalHistoryUpdate,
     session: T_Session,
 ):
-    db_clinical_history = session.query(ClinicalHistory).filter_by(history_id=history_id).first()
-
-    if not db_clinical_history:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Clinical History not found.')
-
-    for key, value in clinical_history.model_dump(exclude_unset=True).items():
-        setattr(db_clinical_history, key, value)
-
-    session.add(db_clinical_history)
-    session.commit()
-    session.refresh(db_clinical_history)
-
-    return db_clinical_history
+    return await update_returning(
+        session,
+        ClinicalHistory,
+        history_id,
+        clinical_history.model_dump(exclude_unset=True),
+        'Clinical History not found.',
+    )
@@ -1,11 +1,20 @@
-from http import HTTPStatus
-from typing import Annotated
+from collections.abc import Callable
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import ComplementaryExam
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
 from fast_zero.schemas import (
+    BulkResult,
+    ComplementaryExamsFields,
     ComplementaryExamsFilter,
     ComplementaryExamsList,
     ComplementaryExamsPublic,
@@ -13,77 +22,91 @@ from fast_zero.schemas import (
     ComplementaryExamsUpdate,
     Message,
 )
-from fast_zero.security import get_session
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/complementary-exams', tags=['complementary-exams'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
 
 
 @router.post('/', response_model=ComplementaryExamsPublic)
-def create_complementary_exam(
+async def create_complementary_exam(
     complementary_exam: ComplementaryExamsSchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_complementary_exam = ComplementaryExam(
         patient_id=complementary_exam.patient_id,
         exam_details=complementary_exam.exam_details,
     )
 
-    session.add(db_complementary_exam)
-    session.commit()
-    session.refresh(db_complementary_exam)
+    return await save(db_complementary_exam, session, coalescer)
 
-    return db_complementary_exam
+
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_complementary_exam(
+    items: Annotated[list[Any], Body()],
+    session: T_Session,
+):
+    return await bulk_insert(session, ComplementaryExam, ComplementaryExamsSchema, items)
 
 
-@router.get('/', response_model=ComplementaryExamsList)
-def list_complementary_exams(
+@router.get('/', response_model=ComplementaryExamsList, response_model_exclude_unset=True)
+async def list_complementary_exams(
     session: T_Session,
     filters: ComplementaryExamsFilter = Depends(),
 ):
-    query = session.query(ComplementaryExam)
+    fields = parse_fields(filters.fields, ComplementaryExamsFields)
+    query = select_fields(ComplementaryExam, ComplementaryExamsFields, ComplementaryExam.exam_id, fields)
 
+    if filters.patient_id:
+        query = query.filter(ComplementaryExam.patient_id == filters.patient_id)
     if filters.exam_details:
         query = query.filter(ComplementaryExam.exam_details.ilike(f'%{filters.exam_details}%'))
 
-    complementary_exams = query.all()
+    complementary_exams, next_cursor = await fetch_page(
+        session, query, ComplementaryExam.exam_id, filters.after, filters.limit
+    )
+
+    return render(
+        ComplementaryExamsList,
+        {'complementary_exams': complementary_exams, 'next_cursor': next_cursor},
+        exclude_unset=True,
+    )
+
+
+@router.get('/export')
+async def export_complementary_exams(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+    patient_id: int | None = None,
+):
+    query = select(ComplementaryExam).order_by(ComplementaryExam.exam_id)
 
-    return {'complementary_exams': complementary_exams}
+    if patient_id:
+        query = query.filter(ComplementaryExam.patient_id == patient_id)
+
+    return export_response(session_factory, query, ComplementaryExamsPublic, format, 'complementary_exams')
 
 
 @router.delete('/{exam_id}', response_model=Message)
-def delete_complementary_exam(
+async def delete_complementary_exam(
     exam_id: int,
     session: T_Session,
 ):
-    complementary_exam = session.query(ComplementaryExam).filter_by(exam_id=exam_id).first()
-
-    if not complementary_exam:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Exam not found.')
-
-    session.delete(complementary_exam)
-    session.commit()
+    await delete_by_pk(session, ComplementaryExam, exam_id, 'Exam not found.')
 
     return {'message': 'Complementary Exam has been deleted successfully.'}
 
 
 @router.patch('/{exam_id}', response_model=ComplementaryExamsPublic)
-def update_complementary_exam(
+async def update_complementary_exam(
     exam_id: int,
     complementary_exam: ComplementaryExamsUpdate,
     session: T_Session,
 ):
-    db_complementary_exam = session.query(ComplementaryExam).filter_by(exam_id=exam_id).first()
-
-    if not db_complementary_exam:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Exam not found.')
-
-    for key, value in complementary_exam.model_dump(exclude_unset=True).items():
-        setattr(db_complementary_exam, key, value)
-
-    session.add(db_complementary_exam)
-    session.commit()
-    session.refresh(db_complementary_exam)
-
-    return db_complementary_exam
+    return await update_returning(
+        session, ComplementaryExam, exam_id, complementary_exam.model_dump(exclude_unset=True), 'Exam not found.'
+    )
@@ -0,0 +1,49 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Request, Response
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html, get_swagger_ui_oauth2_redirect_html
+
+from fast_zero.compression import negotiate
+from fast_zero.openapi import load_openapi
+from fast_zero.settings import get_settings
+
+router = APIRouter(include_in_schema=False)
+settings = get_settings()
+
+
+@router.get('/openapi.json')
+async def read_openapi(request: Request):
+    document = load_openapi(request.app, settings.OPENAPI_SCHEMA_FILE)
+    gzipped = negotiate(request.headers.get('accept-encoding', ''), ['gzip']) is not None
+    etag = document.gzip_etag if gzipped else document.etag
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+
+    # If-None-Match uses the weak comparison: W/"x" matches "x".
+    if_none_match = {tag.strip().removeprefix('W/') for tag in request.headers.get('if-none-match', '').split(',')}
+    if '*' in if_none_match or etag.removeprefix('W/') in if_none_match:
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    if gzipped:
+        return Response(
+            document.gzipped, media_type='application/json', headers={**headers, 'Content-Encoding': 'gzip'}
+        )
+    return Response(document.body, media_type='application/json', headers=headers)
+
+
+@router.get('/docs')
+async def read_docs(request: Request):
+    return get_swagger_ui_html(
+        openapi_url='/openapi.json',
+        title=f'{request.app.title} - Swagger UI',
+        oauth2_redirect_url='/docs/oauth2-redirect',
+    )
+
+
+@router.get('/docs/oauth2-redirect')
+async def read_docs_oauth2_redirect():
+    return get_swagger_ui_oauth2_redirect_html()
+
+
+@router.get('/redoc')
+async def read_redoc(request: Request):
+    return get_redoc_html(openapi_url='/openapi.json', title=f'{request.app.title} - ReDoc')
@@ -0,0 +1,59 @@
+import io
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.database import get_async_session
+from fast_zero.importer import IMPORT_RESOURCES, ImportFormat, ImportLog, guess_format, import_rows, read_rows
+from fast_zero.schemas import ImportReject, ImportReport
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+router = APIRouter(prefix='/import', tags=['import'])
+
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+class ReportedRejects(ImportLog):
+    def __init__(self):
+        self.rejects = []
+
+    def reject(self, row: int, item, detail):
+        if len(self.rejects) < settings.IMPORT_MAX_REPORTED_REJECTS:
+            self.rejects.append(ImportReject(row=row, detail=detail))
+
+
+@router.post('/{resource}', response_model=ImportReport)
+async def import_resource(
+    resource: str,
+    file: UploadFile,
+    session: T_Session,
+    format: ImportFormat | None = None,
+    skip: int = 0,
+):
+    """Import an uploaded CSV or JSON Lines file.
+
+    The upload is spooled to disk and parsed row by row in the threadpool.
+    There is no chunked upload: to resume an interrupted import, send the
+    whole file again with ``skip`` set to the ``processed`` count of the last
+    report. The first ``skip`` rows are then read but neither validated nor
+    inserted.
+    """
+    if resource not in IMPORT_RESOURCES:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Resource cannot be imported.')
+
+    log = ReportedRejects()
+    stream = io.TextIOWrapper(file.file, encoding='utf-8', newline='')
+    try:
+        rows = read_rows(stream, format or guess_format(file.filename or ''))
+        report = await import_rows(session, resource, rows, skip=skip, log=log)
+    finally:
+        # Leave closing the spooled file to the UploadFile.
+        stream.detach()
+
+    report.rejects = log.rejects
+
+    return report
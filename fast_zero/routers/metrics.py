@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from fast_zero.metrics import registry
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', response_class=PlainTextResponse)
+async def read_metrics():
+    return registry.render()
@@ -1,30 +1,107 @@
+from collections.abc import Callable
 from http import HTTPStatus
-from typing import Annotated
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-
-from fast_zero.database import get_session
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Body, Depends, HTTPException
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import Patient
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import default_fields, parse_fields, reject_unknown_fields, select_fields, split_fields
 from fast_zero.schemas import (
+    BulkResult,
+    ClinicalExaminationFields,
+    ClinicalHistoryFields,
+    ComplementaryExamsFields,
     Message,
+    PatientChart,
+    PatientFields,
     PatientFilter,
     PatientList,
     PatientPublic,
     PatientSchema,
     PatientUpdate,
+    PhysiotherapyDiagnosisFields,
+    PrognosisFields,
+    TreatmentPlanFields,
 )
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/patients', tags=['patients'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
+
+PATIENT_RECORDS = {
+    'clinical_histories': Patient.clinical_histories,
+    'clinical_examinations': Patient.clinical_examinations,
+    'complementary_exams': Patient.complementary_exams,
+    'physiotherapy_diagnosis': Patient.physiotherapy_diagnosis,
+    'prognosis': Patient.prognosis,
+    'treatment_plans': Patient.treatment_plans,
+}
+
+RECORD_FIELDS = {
+    'clinical_histories': ClinicalHistoryFields,
+    'clinical_examinations': ClinicalExaminationFields,
+    'complementary_exams': ComplementaryExamsFields,
+    'physiotherapy_diagnosis': PhysiotherapyDiagnosisFields,
+    'prognosis': PrognosisFields,
+    'treatment_plans': TreatmentPlanFields,
+}
+
+
+def parse_include(include: str | None) -> list[str]:
+    if not include:
+        return []
+
+    names = [name.strip() for name in include.split(',') if name.strip()]
+    unknown = [name for name in names if name not in PATIENT_RECORDS]
+    if unknown:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f'Unknown include: {", ".join(unknown)}.')
+
+    return list(dict.fromkeys(names))
+
+
+def parse_chart_fields(fields: str | None) -> dict[str, list[str]]:
+    """Group the fields named for a chart by part: ``''`` for the patient, else the records they belong to.
+
+    Record fields are named ``<records>.<field>``, e.g. ``prognosis.prognosis_details``.
+    """
+    chart_fields = {}
+    unknown = []
+    for name in split_fields(fields):
+        part, _, field = name.rpartition('.')
+        schema = RECORD_FIELDS.get(part) if part else PatientFields
+        if schema is None or field not in schema.model_fields:
+            unknown.append(name)
+        else:
+            chart_fields.setdefault(part, []).append(field)
+
+    reject_unknown_fields(unknown)
+    return chart_fields
+
+
+def expand_patient(patient: Patient, fields: list[str], include: list[str]) -> dict:
+    data = {field: getattr(patient, field) for field in fields}
+    for name in include:
+        data[name] = getattr(patient, name)
+    return data
 
 
 @router.post('/', response_model=PatientPublic)
-def create_patient(
+async def create_patient(
     patient: PatientSchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_patient = Patient(
         full_name=patient.full_name,
@@ -36,20 +113,38 @@ def create_patient(
         residential_address=patient.residential_address,
         commercial_address=patient.commercial_address,
     )
-    session.add(db_patient)
-    session.commit()
-    session.refresh(db_patient)
 
-    return db_patient
+    return await save(db_patient, session, coalescer)
 
 
-@router.get('/', response_model=PatientList)
-def list_patients(
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_patient(
+    items: Annotated[list[Any], Body()],
     session: T_Session,
-    filters: PatientFilter = Depends(),
 ):
-    query = session.query(Patient)
+    return await bulk_insert(session, Patient, PatientSchema, items)
 
+
+@router.get('/', response_model=PatientList, response_model_exclude_unset=True)
+async def list_patients(
+    session: T_Session,
+    filters: PatientFilter = Depends(),
+):
+    include = parse_include(filters.include)
+    fields = parse_fields(filters.fields, PatientFields)
+    columns = list(dict.fromkeys([*(fields or default_fields(Patient, PatientFields, previews=True)), 'id']))
+    if include:
+        # selectinload fetches each requested collection for the whole page
+        # with a single `patient_id IN (...)` query.
+        query = select(Patient).options(
+            load_only(*(getattr(Patient, name) for name in columns)),
+            *(selectinload(PATIENT_RECORDS[name]) for name in include),
+        )
+    else:
+        query = select_fields(Patient, PatientFields, Patient.id, fields)
+
+    if filters.id:
+        query = query.filter(Patient.id == filters.id)
     if filters.full_name:
         query = query.filter(Patient.full_name.ilike(f'%{filters.full_name}%'))
     if filters.age:
@@ -69,38 +164,69 @@ def list_patients(
 
     if filters.offset is not None:
         query = query.offset(filters.offset)
-    if filters.limit is not None:
-        query = query.limit(filters.limit)
 
-    patients = session.scalars(query.offset(filters.offset).limit(filters.limit)).all()
-    return {'patients': patients}
+    patients, next_cursor = await fetch_page(session, query, Patient.id, filters.after, filters.limit)
 
+    return render(
+        PatientList,
+        {
+            'patients': [expand_patient(patient, columns, include) for patient in patients],
+            'next_cursor': next_cursor,
+        },
+        exclude_unset=True,
+    )
 
-@router.delete('/{patient_id}', response_model=Message)
-def delete_patient(patient_id: int, session: T_Session):
-    patient = session.scalar(select(Patient).where(Patient.id == patient_id))
 
-    if not patient:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Task not found.')
+@router.get('/export')
+async def export_patients(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+):
+    query = select(Patient).order_by(Patient.id)
 
-    session.delete(patient)
-    session.commit()
+    return export_response(session_factory, query, PatientPublic, format, 'patients')
 
-    return {'message': 'Task has been deleted successfully.'}
 
+@router.get('/{patient_id}/chart', response_model=PatientChart, response_model_exclude_unset=True)
+async def read_patient_chart(patient_id: int, session: T_Session, fields: str | None = None):
+    chart_fields = parse_chart_fields(fields)
 
-@router.patch('/{patient_id}', response_model=PatientPublic)
-def patch_patient(patient_id: int, session: T_Session, patient: PatientUpdate):
-    db_patient = session.scalar(select(Patient).where(Patient.id == patient_id))
+    patient = (
+        await session.execute(
+            select_fields(Patient, PatientFields, Patient.id, chart_fields.get(''), previews=False).where(
+                Patient.id == patient_id
+            )
+        )
+    ).first()
 
-    if not db_patient:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Task not found.')
+    if not patient:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Patient not found.')
 
-    for key, value in patient.model_dump(exclude_unset=True).items():
-        setattr(db_patient, key, value)
+    chart = patient._asdict()
+    for name, relationship in PATIENT_RECORDS.items():
+        model = relationship.mapper.class_
+        pk_column = getattr(model, inspect(model).primary_key[0].key)
+        query = select_fields(model, RECORD_FIELDS[name], pk_column, chart_fields.get(name), previews=False)
+        chart[name] = (await session.execute(query.where(model.patient_id == patient_id).order_by(pk_column))).all()
 
-    session.add(db_patient)
-    session.commit()
-    session.refresh(db_patient)
+    return chart
 
-    return db_patient
+
+@router.delete('/{patient_id}', response_model=Message)
+async def delete_patient(patient_id: int, session: T_Session):
+    # The clinical records reference the patient without ON DELETE CASCADE, so
+    # a patient with records cannot be deleted until they are.
+    try:
+        await delete_by_pk(session, Patient, patient_id, 'Task not found.')
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=HTTPStatus.CONFLICT, detail='Patient has clinical records.')
+
+    return {'message': 'Task has been deleted successfully.'}
+
+
+@router.patch('/{patient_id}', response_model=PatientPublic)
+async def patch_patient(patient_id: int, session: T_Session, patient: PatientUpdate):
+    return await update_returning(
+        session, Patient, patient_id, patient.model_dump(exclude_unset=True), 'Task not found.'
+    )
@@ -1,89 +1,118 @@
-from http import HTTPStatus
-from typing import Annotated
+from collections.abc import Callable
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import PhysiotherapyDiagosis
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
 from fast_zero.schemas import (
+    BulkResult,
     Message,
+    PhysiotherapyDiagnosisFields,
     PhysiotherapyDiagnosisFilter,
     PhysiotherapyDiagnosisList,
     PhysiotherapyDiagnosisPublic,
     PhysiotherapyDiagnosisSchema,
     PhysiotherapyDiagnosisUpdate,
 )
-from fast_zero.security import get_session
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/physiotherapy-diagnosis', tags=['physiotherapy-diagnosis'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
 
 
 @router.post('/', response_model=PhysiotherapyDiagnosisPublic)
-def create_physiotherapy_diagnosis(
+async def create_physiotherapy_diagnosis(
     physiotherapy_diagnosis: PhysiotherapyDiagnosisSchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_physiotherapy_diagnosis = PhysiotherapyDiagosis(
         patient_id=physiotherapy_diagnosis.patient_id,
         diagnosis_details=physiotherapy_diagnosis.diagnosis_details,
     )
 
-    session.add(db_physiotherapy_diagnosis)
-    session.commit()
-    session.refresh(db_physiotherapy_diagnosis)
+    return await save(db_physiotherapy_diagnosis, session, coalescer)
 
-    return db_physiotherapy_diagnosis
+
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_physiotherapy_diagnosis(
+    items: Annotated[list[Any], Body()],
+    session: T_Session,
+):
+    return await bulk_insert(session, PhysiotherapyDiagosis, PhysiotherapyDiagnosisSchema, items)
 
 
-@router.get('/', response_model=PhysiotherapyDiagnosisList)
-def list_physiotherapy_diagnosis(
+@router.get('/', response_model=PhysiotherapyDiagnosisList, response_model_exclude_unset=True)
+async def list_physiotherapy_diagnosis(
     session: T_Session,
     filters: PhysiotherapyDiagnosisFilter = Depends(),
 ):
-    query = session.query(PhysiotherapyDiagosis)
+    fields = parse_fields(filters.fields, PhysiotherapyDiagnosisFields)
+    query = select_fields(
+        PhysiotherapyDiagosis, PhysiotherapyDiagnosisFields, PhysiotherapyDiagosis.diagnosis_id, fields
+    )
 
+    if filters.patient_id:
+        query = query.filter(PhysiotherapyDiagosis.patient_id == filters.patient_id)
     if filters.diagnosis_details:
         query = query.filter(PhysiotherapyDiagosis.diagnosis_details.ilike(f'%{filters.diagnosis_details}%'))
 
-    physiotherapy_diagnosis = query.all()
+    physiotherapy_diagnosis, next_cursor = await fetch_page(
+        session, query, PhysiotherapyDiagosis.diagnosis_id, filters.after, filters.limit
+    )
+
+    return render(
+        PhysiotherapyDiagnosisList,
+        {'physiotherapy_diagnosis': physiotherapy_diagnosis, 'next_cursor': next_cursor},
+        exclude_unset=True,
+    )
+
+
+@router.get('/export')
+async def export_physiotherapy_diagnosis(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+    patient_id: int | None = None,
+):
+    query = select(PhysiotherapyDiagosis).order_by(PhysiotherapyDiagosis.diagnosis_id)
+
+    if patient_id:
+        query = query.filter(PhysiotherapyDiagosis.patient_id == patient_id)
 
-    return {'physiotherapy_diagnosis': physiotherapy_diagnosis}
+    return export_response(session_factory, query, PhysiotherapyDiagnosisPublic, format, 'physiotherapy_diagnosis')
 
 
 @router.delete('/{diagnosis_id}', response_model=Message)
-def delete_physiotherapy_diagnosis(
+async def delete_physiotherapy_diagnosis(
     diagnosis_id: int,
     session: T_Session,
 ):
-    physiotherapy_diagnosis = session.query(PhysiotherapyDiagosis).filter_by(diagnosis_id=diagnosis_id).first()
-
-    if not physiotherapy_diagnosis:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Diagnosis not found.')
-
-    session.delete(physiotherapy_diagnosis)
-    session.commit()
+    await delete_by_pk(session, PhysiotherapyDiagosis, diagnosis_id, 'Diagnosis not found.')
 
     return {'message': 'Diagnosis has been deleted successfully.'}
 
 
 @router.patch('/{diagnosis_id}', response_model=PhysiotherapyDiagnosisPublic)
-def update_physiotherapy_diagnosis(
+async def update_physiotherapy_diagnosis(
     diagnosis_id: int,
     physiotherapy_diagnosis: PhysiotherapyDiagnosisUpdate,
     session: T_Session,
 ):
-    db_physiotherapy_diagnosis = session.query(PhysiotherapyDiagosis).filter_by(diagnosis_id=diagnosis_id).first()
-
-    if not db_physiotherapy_diagnosis:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Diagnosis not found.')
-
-    for key, value in physiotherapy_diagnosis.model_dump(exclude_unset=True).items():
-        setattr(db_physiotherapy_diagnosis, key, value)
-
-    session.add(db_physiotherapy_diagnosis)
-    session.commit()
-    session.refresh(db_physiotherapy_diagnosis)
-
-    return db_physiotherapy_diagnosis
+    return await update_returning(
+        session,
+        PhysiotherapyDiagosis,
+        diagnosis_id,
+        physiotherapy_diagnosis.model_dump(exclude_unset=True),
+        'Diagnosis not found.',
+    )
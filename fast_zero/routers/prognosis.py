@@ -1,89 +1,106 @@
-from http import HTTPStatus
-from typing import Annotated
+from collections.abc import Callable
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import Prognosis
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
 from fast_zero.schemas import (
+    BulkResult,
     Message,
+    PrognosisFields,
     PrognosisFilter,
     PrognosisList,
     PrognosisPublic,
     PrognosisSchema,
     PrognosisUpdate,
 )
-from fast_zero.security import get_session
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/prognosis', tags=['prognosis'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
 
 
 @router.post('/', response_model=PrognosisPublic)
-def create_physiotherapy_diagnosis(
+async def create_physiotherapy_diagnosis(
     prognosis: PrognosisSchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_prognosis = Prognosis(
         patient_id=prognosis.patient_id,
         prognosis_details=prognosis.prognosis_details,
     )
 
-    session.add(db_prognosis)
-    session.commit()
-    session.refresh(db_prognosis)
+    return await save(db_prognosis, session, coalescer)
 
-    return db_prognosis
 
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_prognosis(
+    items: Annotated[list[Any], Body()],
+    session: T_Session,
+):
+    return await bulk_insert(session, Prognosis, PrognosisSchema, items)
 
-@router.get('/', response_model=PrognosisList)
-def list_prognosis(
+
+@router.get('/', response_model=PrognosisList, response_model_exclude_unset=True)
+async def list_prognosis(
     session: T_Session,
     filters: PrognosisFilter = Depends(),
 ):
-    query = session.query(Prognosis)
+    fields = parse_fields(filters.fields, PrognosisFields)
+    query = select_fields(Prognosis, PrognosisFields, Prognosis.prognosis_id, fields)
 
+    if filters.patient_id:
+        query = query.filter(Prognosis.patient_id == filters.patient_id)
     if filters.prognosis_details:
         query = query.filter(Prognosis.prognosis_details.ilike(f'%{filters.prognosis_details}%'))
 
-    prognosis = query.all()
+    prognosis, next_cursor = await fetch_page(session, query, Prognosis.prognosis_id, filters.after, filters.limit)
+
+    return render(PrognosisList, {'prognosis': prognosis, 'next_cursor': next_cursor}, exclude_unset=True)
+
+
+@router.get('/export')
+async def export_prognosis(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+    patient_id: int | None = None,
+):
+    query = select(Prognosis).order_by(Prognosis.prognosis_id)
+
+    if patient_id:
+        query = query.filter(Prognosis.patient_id == patient_id)
 
-    return {'prognosis': prognosis}
+    return export_response(session_factory, query, PrognosisPublic, format, 'prognosis')
 
 
 @router.delete('/{prognosis_id}', response_model=Message)
-def delete_prognosis(
+async def delete_prognosis(
     prognosis_id: int,
     session: T_Session,
 ):
-    prognosis = session.query(Prognosis).filter_by(prognosis_id=prognosis_id).first()
-
-    if not prognosis:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Prognosis not found.')
-
-    session.delete(prognosis)
-    session.commit()
+    await delete_by_pk(session, Prognosis, prognosis_id, 'Prognosis not found.')
 
     return {'message': 'Prognosis has been deleted successfully.'}
 
 
 @router.patch('/{prognosis_id}', response_model=PrognosisPublic)
-def update_prognosis(
+async def update_prognosis(
     prognosis_id: int,
     prognosis: PrognosisUpdate,
     session: T_Session,
 ):
-    db_prognosis = session.query(Prognosis).filter_by(prognosis_id=prognosis_id).first()
-
-    if not db_prognosis:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Prognosis not found.')
-
-    for key, value in prognosis.model_dump(exclude_unset=True).items():
-        setattr(db_prognosis, key, value)
-
-    session.add(db_prognosis)
-    session.commit()
-    session.refresh(db_prognosis)
-
-    return db_prognosis
+    return await update_returning(
+        session, Prognosis, prognosis_id, prognosis.model_dump(exclude_unset=True), 'Prognosis not found.'
+    )
@@ -0,0 +1,30 @@
+from http import HTTPStatus
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.database import get_async_session
+from fast_zero.models import SEARCH_INDEXES
+from fast_zero.schemas import SearchResults
+from fast_zero.search import search
+
+router = APIRouter(prefix='/search', tags=['search'])
+
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+@router.get('/{resource}', response_model=SearchResults)
+async def search_resource(
+    resource: str,
+    session: T_Session,
+    q: Annotated[str, Query(min_length=1)],
+    patient_id: int | None = None,
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+):
+    index = SEARCH_INDEXES.get(resource)
+
+    if not index:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Resource is not searchable.')
+
+    return {'results': await search(session, index, q, patient_id, limit)}
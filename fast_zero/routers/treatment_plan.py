@@ -1,31 +1,43 @@
-from http import HTTPStatus
-from typing import Annotated
+from collections.abc import Callable
+from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer, save
+from fast_zero.crud import bulk_insert, delete_by_pk, update_returning
+from fast_zero.database import get_async_session, get_session_factory
+from fast_zero.export import ExportFormat, export_response
 from fast_zero.models import TreatmentPlan
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
 from fast_zero.schemas import (
+    BulkResult,
     Message,
     PatientFilter,
+    TreatmentPlanFields,
     TreatmentPlanFilter,
     TreatmentPlanList,
     TreatmentPlanPublic,
     TreatmentPlanSchema,
     TreatmentPlanUpdate,
 )
-from fast_zero.security import get_session
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/treatment-plan', tags=['treatment-plan'])
 
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
+T_SessionFactory = Annotated[Callable[[], AsyncSession], Depends(get_session_factory)]
+T_WriteCoalescer = Annotated[WriteCoalescer | None, Depends(get_write_coalescer)]
 CurrentPatient = Annotated[PatientFilter, Depends()]
 
 
 @router.post('/', response_model=TreatmentPlanPublic)
-def create_treatment_plan(
+async def create_treatment_plan(
     treatment_plan: TreatmentPlanSchema,
     session: T_Session,
+    coalescer: T_WriteCoalescer,
 ):
     db_treatment_plan = TreatmentPlan(
         patient_id=treatment_plan.patient_id,
@@ -33,19 +45,25 @@ def create_treatment_plan(
         probable_sessions=treatment_plan.probable_sessions,
         procedures=treatment_plan.procedures,
     )
-    session.add(db_treatment_plan)
-    session.commit()
-    session.refresh(db_treatment_plan)
 
-    return db_treatment_plan
+    return await save(db_treatment_plan, session, coalescer)
 
 
-@router.get('/', response_model=TreatmentPlanList)
-def list_treatment_plans(
+@router.post('/bulk', response_model=BulkResult)
+async def bulk_create_treatment_plan(
+    items: Annotated[list[Any], Body()],
+    session: T_Session,
+):
+    return await bulk_insert(session, TreatmentPlan, TreatmentPlanSchema, items)
+
+
+@router.get('/', response_model=TreatmentPlanList, response_model_exclude_unset=True)
+async def list_treatment_plans(
     session: T_Session,
     filters: TreatmentPlanFilter = Depends(),
 ):
-    query = session.query(TreatmentPlan)
+    fields = parse_fields(filters.fields, TreatmentPlanFields)
+    query = select_fields(TreatmentPlan, TreatmentPlanFields, TreatmentPlan.plan_id, fields)
 
     if filters.patient_id:
         query = query.filter(TreatmentPlan.patient_id == filters.patient_id)
@@ -56,42 +74,47 @@ def list_treatment_plans(
     if filters.procedures:
         query = query.filter(TreatmentPlan.procedures.ilike(f'%{filters.procedures}%'))
 
-    treatment_plans = query.all()
+    treatment_plans, next_cursor = await fetch_page(session, query, TreatmentPlan.plan_id, filters.after, filters.limit)
+
+    return render(
+        TreatmentPlanList, {'treatment_plans': treatment_plans, 'next_cursor': next_cursor}, exclude_unset=True
+    )
+
+
+@router.get('/export')
+async def export_treatment_plans(
+    session_factory: T_SessionFactory,
+    format: ExportFormat = 'ndjson',
+    patient_id: int | None = None,
+):
+    query = select(TreatmentPlan).order_by(TreatmentPlan.plan_id)
 
-    return {'treatment_plans': treatment_plans}
+    if patient_id:
+        query = query.filter(TreatmentPlan.patient_id == patient_id)
+
+    return export_response(session_factory, query, TreatmentPlanPublic, format, 'treatment_plans')
 
 
 @router.delete('/{plan_id}', response_model=Message)
-def delete_treatment_plan(
+async def delete_treatment_plan(
     plan_id: int,
     session: T_Session,
 ):
-    treatment_plan = session.query(TreatmentPlan).filter_by(plan_id=plan_id).first()
-
-    if not treatment_plan:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Treatment plan not found.')
-
-    session.delete(treatment_plan)
-    session.commit()
+    await delete_by_pk(session, TreatmentPlan, plan_id, 'Treatment plan not found.')
 
     return {'message': 'Treatment plan deleted successfully.'}
 
 
 @router.patch('/{plan_id}', response_model=TreatmentPlanPublic)
-def update_treatment_plan(
+async def update_treatment_plan(
     plan_id: int,
     treatment_plan: TreatmentPlanUpdate,
     session: T_Session,
 ):
-    db_treatment_plan = session.query(TreatmentPlan).filter_by(plan_id=plan_id).first()
-
-    if not db_treatment_plan:
-        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail='Treatment plan not found.')
-
-    for key, value in treatment_plan.model_dump(exclude_unset=True).items():
-        setattr(db_treatment_plan, key, value)
-
-    session.commit()
-    session.refresh(db_treatment_plan)
-
-    return db_treatment_plan
+    return await update_returning(
+        session,
+        TreatmentPlan,
+        plan_id,
+        treatment_plan.model_dump(exclude_unset=True),
+        'Treatment plan not found.',
+    )
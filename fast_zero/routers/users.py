@@ -3,27 +3,41 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
-from sqlalchemy.orm import Session
-
-from fast_zero.database import get_session
-from fast_zero.models import User
-from fast_zero.schemas import Message, UserList, UserPublic, UserSchema
-from fast_zero.security import get_current_user, get_password_hash
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.crud import delete_by_pk, insert_returning, update_returning
+from fast_zero.database import get_async_session
+from fast_zero.models import RefreshToken, User
+from fast_zero.pagination import fetch_page
+from fast_zero.projection import parse_fields, select_fields
+from fast_zero.ratelimit import limit_signup
+from fast_zero.refresh_tokens import revoke_refresh_tokens
+from fast_zero.schemas import Message, UserFields, UserList, UserPublic, UserSchema
+from fast_zero.security import get_current_user, get_password_hasher, token_cache
+from fast_zero.serialization import render
 
 router = APIRouter(prefix='/users', tags=['users'])
-T_Session = Annotated[Session, Depends(get_session)]
+T_Session = Annotated[AsyncSession, Depends(get_async_session)]
 T_CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-@router.get('/', response_model=UserList)
-def read_users(session: T_Session, limit: int = 10, skip: int = 0):
-    user = session.scalars(select(User).limit(limit).offset(skip))
-    return {'users': user}
+@router.get('/', response_model=UserList, response_model_exclude_unset=True)
+async def read_users(
+    session: T_Session, limit: int = 10, skip: int = 0, after: str | None = None, fields: str | None = None
+):
+    query = select_fields(User, UserFields, User.id, parse_fields(fields, UserFields)).offset(skip)
+    users, next_cursor = await fetch_page(session, query, User.id, after, limit)
+    return render(UserList, {'users': users, 'next_cursor': next_cursor}, exclude_unset=True)
 
 
-@router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
-def create_user(user: UserSchema, session: T_Session):
-    db_user = session.scalar(select(User).where((User.username == user.username) | (User.email == user.email)))
+@router.post(
+    '/',
+    status_code=HTTPStatus.CREATED,
+    response_model=UserPublic,
+    dependencies=[Depends(limit_signup)],
+)
+async def create_user(user: UserSchema, session: T_Session):
+    db_user = await session.scalar(select(User).where((User.username == user.username) | (User.email == user.email)))
 
     if db_user:
         if db_user.username == user.username:
@@ -40,18 +54,14 @@ def create_user(user: UserSchema, session: T_Session):
     db_user = User(
         username=user.username,
         email=user.email,
-        password=get_password_hash(user.password),
+        password=await get_password_hasher().hash(user.password),
     )
 
-    session.add(db_user)
-    session.commit()
-    session.refresh(db_user)
-
-    return db_user
+    return await insert_returning(session, db_user)
 
 
 @router.put('/{user_id}', response_model=UserPublic)
-def update_user(
+async def update_user(
     user_id: int,
     user: UserSchema,
     session: T_Session,
@@ -60,23 +70,26 @@ def update_user(
     if current_user.id != user_id:
         raise HTTPException(HTTPStatus.FORBIDDEN, detail='Not enough permissions')
 
-    current_user.email = user.email
-    current_user.username = user.username
-    current_user.password = get_password_hash(user.password)
+    values = {
+        'email': user.email,
+        'username': user.username,
+        'password': await get_password_hasher().hash(user.password),
+    }
 
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
+    # update_returning commits, so the old refresh tokens go in the same transaction as the new password.
+    await revoke_refresh_tokens(session, RefreshToken.user_id == user_id)
+    db_user = await update_returning(session, User, user_id, values, 'User not found')
+    token_cache.invalidate_user(user_id)
 
-    return current_user
+    return db_user
 
 
 @router.delete('/{user_id}', response_model=Message)
-def delete_user(user_id: int, session: T_Session, current_user: T_CurrentUser):
+async def delete_user(user_id: int, session: T_Session, current_user: T_CurrentUser):
     if current_user.id != user_id:
         raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions')
 
-    session.delete(current_user)
-    session.commit()
+    await delete_by_pk(session, User, user_id, 'User not found')
+    token_cache.invalidate_user(user_id)
 
     return {'message': 'User deleted'}
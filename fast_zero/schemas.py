@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
@@ -7,6 +7,30 @@ class Message(BaseModel):
     message: str
 
 
+class BulkItemError(BaseModel):
+    index: int
+    detail: Any
+
+
+class BulkResult(BaseModel):
+    ids: List[Optional[int]]
+    errors: List[BulkItemError]
+
+
+class ImportReject(BaseModel):
+    row: int
+    detail: Any
+
+
+class ImportReport(BaseModel):
+    processed: int = 0
+    imported: int = 0
+    rejected: int = 0
+    seconds: float = 0
+    rows_per_second: float = 0
+    rejects: List[ImportReject] = []
+
+
 class UserSchema(BaseModel):
     username: str
     email: EmailStr
@@ -20,13 +44,25 @@ class UserPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserFields(BaseModel):
+    id: Optional[int] = None
+    username: Optional[str] = None
+    email: Optional[EmailStr] = None
+
+
 class UserList(BaseModel):
-    users: List[UserPublic]
+    users: List[UserFields]
+    next_cursor: Optional[str] = None
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 
 class PatientSchema(BaseModel):
@@ -44,8 +80,16 @@ class PatientPublic(PatientSchema):
     id: int
 
 
-class PatientList(BaseModel):
-    patients: List[PatientPublic]
+class PatientFields(BaseModel):
+    full_name: Optional[str] = None
+    age: Optional[int] = None
+    place_of_birth: Optional[str] = None
+    marital_status: Optional[str] = None
+    gender: Optional[str] = None
+    profession: Optional[str] = None
+    residential_address: Optional[str] = None
+    commercial_address: Optional[str] = None
+    id: Optional[int] = None
 
 
 class PatientFilter(BaseModel):
@@ -60,6 +104,9 @@ class PatientFilter(BaseModel):
     commercial_address: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    include: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class PatientUpdate(BaseModel):
@@ -89,8 +136,22 @@ class ClinicalHistoryPublic(ClinicalHistorySchema):
     history_id: int
 
 
+class ClinicalHistoryFields(BaseModel):
+    patient_id: Optional[int] = None
+    main_complaint: Optional[str] = None
+    disease_history: Optional[str] = None
+    lifestyle_habits: Optional[str] = None
+    previous_treatments: Optional[str] = None
+    personal_family_history: Optional[str] = None
+    other_information: Optional[str] = None
+    history_id: Optional[int] = None
+    disease_history_preview: Optional[str] = None
+    personal_family_history_preview: Optional[str] = None
+
+
 class ClinicalHistoryList(BaseModel):
-    clinical_histories: List[ClinicalHistoryPublic]
+    clinical_histories: List[ClinicalHistoryFields]
+    next_cursor: Optional[str] = None
 
 
 class ClinicalHistoryFilter(BaseModel):
@@ -103,6 +164,8 @@ class ClinicalHistoryFilter(BaseModel):
     other_information: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class ClinicalHistoryUpdate(BaseModel):
@@ -126,8 +189,15 @@ class ClinicalExaminationPublic(ClinicalExaminationSchema):
     exam_id: int
 
 
+class ClinicalExaminationFields(BaseModel):
+    patient_id: Optional[int] = None
+    exam_details: Optional[str] = None
+    exam_id: Optional[int] = None
+
+
 class ClinicalExaminationList(BaseModel):
-    clinical_examinations: List[ClinicalExaminationPublic]
+    clinical_examinations: List[ClinicalExaminationFields]
+    next_cursor: Optional[str] = None
 
 
 class ClinicalExaminationFilter(BaseModel):
@@ -135,6 +205,8 @@ class ClinicalExaminationFilter(BaseModel):
     exam_details: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class ClinicalExaminationUpdate(BaseModel):
@@ -153,8 +225,15 @@ class ComplementaryExamsPublic(ComplementaryExamsSchema):
     exam_id: int
 
 
+class ComplementaryExamsFields(BaseModel):
+    patient_id: Optional[int] = None
+    exam_details: Optional[str] = None
+    exam_id: Optional[int] = None
+
+
 class ComplementaryExamsList(BaseModel):
-    complementary_exams: List[ComplementaryExamsPublic]
+    complementary_exams: List[ComplementaryExamsFields]
+    next_cursor: Optional[str] = None
 
 
 class ComplementaryExamsFilter(BaseModel):
@@ -162,6 +241,8 @@ class ComplementaryExamsFilter(BaseModel):
     exam_details: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class ComplementaryExamsUpdate(BaseModel):
@@ -180,8 +261,15 @@ class PhysiotherapyDiagnosisPublic(PhysiotherapyDiagnosisSchema):
     diagnosis_id: int
 
 
+class PhysiotherapyDiagnosisFields(BaseModel):
+    patient_id: Optional[int] = None
+    diagnosis_details: Optional[str] = None
+    diagnosis_id: Optional[int] = None
+
+
 class PhysiotherapyDiagnosisList(BaseModel):
-    physiotherapy_diagnosis: List[PhysiotherapyDiagnosisPublic]
+    physiotherapy_diagnosis: List[PhysiotherapyDiagnosisFields]
+    next_cursor: Optional[str] = None
 
 
 class PhysiotherapyDiagnosisFilter(BaseModel):
@@ -189,6 +277,8 @@ class PhysiotherapyDiagnosisFilter(BaseModel):
     diagnosis_details: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class PhysiotherapyDiagnosisUpdate(BaseModel):
@@ -207,8 +297,15 @@ class PrognosisPublic(PrognosisSchema):
     prognosis_id: int
 
 
+class PrognosisFields(BaseModel):
+    patient_id: Optional[int] = None
+    prognosis_details: Optional[str] = None
+    prognosis_id: Optional[int] = None
+
+
 class PrognosisList(BaseModel):
-    prognosis: List[PrognosisPublic]
+    prognosis: List[PrognosisFields]
+    next_cursor: Optional[str] = None
 
 
 class PrognosisFilter(BaseModel):
@@ -216,6 +313,8 @@ class PrognosisFilter(BaseModel):
     prognosis_details: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class PrognosisUpdate(BaseModel):
@@ -236,8 +335,18 @@ class TreatmentPlanPublic(TreatmentPlanSchema):
     plan_id: int
 
 
+class TreatmentPlanFields(BaseModel):
+    patient_id: Optional[int] = None
+    objectives: Optional[str] = None
+    probable_sessions: Optional[int] = None
+    procedures: Optional[str] = None
+    plan_id: Optional[int] = None
+    procedures_preview: Optional[str] = None
+
+
 class TreatmentPlanList(BaseModel):
-    treatment_plans: List[TreatmentPlanPublic]
+    treatment_plans: List[TreatmentPlanFields]
+    next_cursor: Optional[str] = None
 
 
 class TreatmentPlanFilter(BaseModel):
@@ -247,6 +356,8 @@ class TreatmentPlanFilter(BaseModel):
     procedures: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+    after: Optional[str] = None
+    fields: Optional[str] = None
 
 
 class TreatmentPlanUpdate(BaseModel):
@@ -256,3 +367,37 @@ class TreatmentPlanUpdate(BaseModel):
     procedures: Optional[str] = None
     offset: Optional[int] = None
     limit: Optional[int] = None
+
+
+class PatientChart(PatientFields):
+    clinical_histories: List[ClinicalHistoryFields]
+    clinical_examinations: List[ClinicalExaminationFields]
+    complementary_exams: List[ComplementaryExamsFields]
+    physiotherapy_diagnosis: List[PhysiotherapyDiagnosisFields]
+    prognosis: List[PrognosisFields]
+    treatment_plans: List[TreatmentPlanFields]
+
+
+class PatientExpanded(PatientFields):
+    clinical_histories: Optional[List[ClinicalHistoryFields]] = None
+    clinical_examinations: Optional[List[ClinicalExaminationFields]] = None
+    complementary_exams: Optional[List[ComplementaryExamsFields]] = None
+    physiotherapy_diagnosis: Optional[List[PhysiotherapyDiagnosisFields]] = None
+    prognosis: Optional[List[PrognosisFields]] = None
+    treatment_plans: Optional[List[TreatmentPlanFields]] = None
+
+
+class PatientList(BaseModel):
+    patients: List[PatientExpanded]
+    next_cursor: Optional[str] = None
+
+
+class SearchHit(BaseModel):
+    id: int
+    patient_id: int
+    rank: float
+    snippet: str
+
+
+class SearchResults(BaseModel):
+    results: List[SearchHit]
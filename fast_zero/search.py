@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import DDL, Table, event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+SNIPPET_WORDS = 12
+POSTGRES_CONFIG = 'portuguese'
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """Free-text columns of one table and how to search them.
+
+    SQLite keeps an external-content FTS5 table in sync through triggers;
+    Postgres searches a ``tsvector`` expression backed by a GIN index. The
+    indexes are defined next to their tables in ``fast_zero.models``, so
+    ``create_all`` builds them whether or not this module was imported.
+    """
+
+    table: Table
+    columns: tuple[str, ...]
+
+    @property
+    def name(self):
+        return self.table.name
+
+    @property
+    def pk(self):
+        return self.table.primary_key.columns[0].name
+
+    @property
+    def fts_table(self):
+        return f'{self.name}_fts'
+
+    @property
+    def document(self):
+        return " || ' ' || ".join(f"coalesce({column}, '')" for column in self.columns)
+
+    def sqlite_ddl(self):
+        columns = ', '.join(self.columns)
+        new = ', '.join(f'new.{column}' for column in self.columns)
+        old = ', '.join(f'old.{column}' for column in self.columns)
+        insert = f'INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.{self.pk}, {new});'
+        delete = (
+            f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) VALUES ('delete', old.{self.pk}, {old});"
+        )
+
+        return [
+            f'CREATE VIRTUAL TABLE {self.fts_table} USING fts5({columns}, '
+            f"content='{self.name}', content_rowid='{self.pk}', tokenize='unicode61 remove_diacritics 2')",
+            f'CREATE TRIGGER {self.name}_fts_ai AFTER INSERT ON {self.name} BEGIN {insert} END',
+            f'CREATE TRIGGER {self.name}_fts_ad AFTER DELETE ON {self.name} BEGIN {delete} END',
+            f'CREATE TRIGGER {self.name}_fts_au AFTER UPDATE ON {self.name} BEGIN {delete} {insert} END',
+        ]
+
+    def postgresql_ddl(self):
+        return [
+            f'CREATE INDEX ix_{self.name}_fts ON {self.name} '
+            f"USING gin (to_tsvector('{POSTGRES_CONFIG}', {self.document}))"
+        ]
+
+    def listen_for_ddl(self):
+        """Create the index with the table and drop it before the table."""
+        for statement in self.sqlite_ddl():
+            event.listen(self.table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+        for statement in self.postgresql_ddl():
+            event.listen(self.table, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+        event.listen(
+            self.table,
+            'before_drop',
+            DDL(f'DROP TABLE IF EXISTS {self.fts_table}').execute_if(dialect='sqlite'),
+        )
+
+    def sqlite_query(self, patient_id: int | None):
+        patient_filter = 'AND t.patient_id = :patient_id' if patient_id is not None else ''
+        return text(
+            f'SELECT t.{self.pk} AS id, t.patient_id, -bm25({self.fts_table}) AS rank, '
+            f"snippet({self.fts_table}, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_STOP}', '…', {SNIPPET_WORDS}) AS snippet "
+            f'FROM {self.fts_table} JOIN {self.name} AS t ON t.{self.pk} = {self.fts_table}.rowid '
+            f'WHERE {self.fts_table} MATCH :query {patient_filter} '
+            'ORDER BY rank DESC LIMIT :limit'
+        )
+
+    def postgresql_query(self, patient_id: int | None):
+        patient_filter = 'AND t.patient_id = :patient_id' if patient_id is not None else ''
+        vector = f"to_tsvector('{POSTGRES_CONFIG}', {self.document})"
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords={SNIPPET_WORDS}, MinWords=3'
+        return text(
+            f'SELECT t.{self.pk} AS id, t.patient_id, ts_rank({vector}, q) AS rank, '
+            f"ts_headline('{POSTGRES_CONFIG}', {self.document}, q, '{options}') AS snippet "
+            f"FROM {self.name} AS t, websearch_to_tsquery('{POSTGRES_CONFIG}', :query) AS q "
+            f'WHERE {vector} @@ q {patient_filter} '
+            'ORDER BY rank DESC LIMIT :limit'
+        )
+
+
+def to_fts5_query(query: str) -> str:
+    """Quote every word so user input can never be parsed as FTS5 syntax."""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', query))
+
+
+async def search(session: AsyncSession, index: SearchIndex, query: str, patient_id: int | None, limit: int):
+    if session.get_bind().dialect.name == 'postgresql':
+        statement = index.postgresql_query(patient_id)
+    else:
+        statement = index.sqlite_query(patient_id)
+        query = to_fts5_query(query)
+
+    if not query:
+        return []
+
+    result = await session.execute(statement, {'query': query, 'patient_id': patient_id, 'limit': limit})
+    return result.mappings().all()
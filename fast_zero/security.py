@@ -1,30 +1,188 @@
+import asyncio
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from functools import cache
 from http import HTTPStatus
+from multiprocessing import get_context
+from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jwt import decode, encode
 from jwt.exceptions import ExpiredSignatureError, PyJWTError
-from pwdlib import PasswordHash
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-from zoneinfo import ZoneInfo
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fast_zero.database import get_session
+from fast_zero import passwords
+from fast_zero.database import get_async_session
+from fast_zero.metrics import registry
 from fast_zero.models import User
-from fast_zero.settings import Settings
+from fast_zero.revocation import revocation_list, revoke
+from fast_zero.settings import get_settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
-pwd_context = PasswordHash.recommended()
-settings = Settings()
+settings = get_settings()
+
+token_cache_hits = registry.counter('token_cache_hits_total', 'Requests authenticated from the token cache.')
+token_cache_misses = registry.counter('token_cache_misses_total', 'Requests that had to verify their token.')
+
+
+class TokenCache:
+    """Remember which user a verified token belongs to.
+
+    Entries live ``ttl`` seconds at most, never past the token's own ``exp``,
+    and the least recently used one is dropped once ``max_size`` is reached.
+    Anything that changes or removes a user must call ``invalidate_user``.
+    That only reaches this process: with several workers, a token of a
+    changed or deleted user may still be accepted by the others for up to
+    ``TOKEN_CACHE_TTL_SECONDS``.
+    """
+
+    def __init__(self, ttl: int, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def get(self, token: str) -> tuple[User, str | None] | None:
+        """Return the user and ``jti`` of a cached token."""
+        entry = self.entries.get(token)
+        if entry is None:
+            token_cache_misses.inc()
+            return None
+
+        user, jti, expires_at = entry
+        if expires_at <= time.time():
+            del self.entries[token]
+            token_cache_misses.inc()
+            return None
+
+        self.entries.move_to_end(token)
+        token_cache_hits.inc()
+        return user, jti
+
+    def put(self, token: str, user: User, jti: str | None, exp: float):
+        if self.ttl <= 0:
+            return
+
+        self.entries[token] = (user, jti, min(time.time() + self.ttl, exp))
+        self.entries.move_to_end(token)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        for token in [token for token, (user, _, _) in self.entries.items() if user.id == user_id]:
+            del self.entries[token]
+
+    def clear(self):
+        self.entries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_TTL_SECONDS, settings.TOKEN_CACHE_MAX_SIZE)
+
+
+password_hash_seconds = registry.histogram(
+    'password_hash_seconds',
+    'Time to hash or verify a password, including time spent queued.',
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+password_hash_rejected = registry.counter(
+    'password_hash_rejected_total',
+    'Password operations refused because too many were already pending.',
+)
+
+
+class PasswordHasher:
+    """Run Argon2 in a pool of ``workers`` processes, off the event loop and the threadpool.
+
+    At most ``max_pending`` operations may be queued or running; past that
+    callers get a 503 straight away rather than waiting behind the burst.
+    With ``workers`` set to 0 the work runs in the threadpool instead.
+    """
+
+    def __init__(self, workers: int, max_pending: int, argon2_params: tuple[int, int, int] | None = None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.argon2_params = argon2_params
+        self.pending = 0
+        self.executor = None
+
+    async def run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            password_hash_rejected.inc()
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Too many logins in progress, try again shortly.',
+                headers={'Retry-After': '1'},
+            )
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+
+            if self.executor is None:
+                # spawn keeps the workers clear of the locks and sockets a fork would copy.
+                self.executor = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=get_context('spawn'),
+                    initializer=passwords.configure if self.argon2_params else None,
+                    initargs=self.argon2_params or (),
+                )
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+            password_hash_seconds.observe(time.perf_counter() - started)
+
+    async def hash(self, password: str) -> str:
+        return await self.run(passwords.hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(passwords.verify_password, plain_password, hashed_password)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+
+@cache
+def get_password_hasher() -> PasswordHasher:
+    """Configure Argon2 and build the shared hasher on first use rather than at import."""
+    argon2_params = (settings.ARGON2_TIME_COST, settings.ARGON2_MEMORY_COST, settings.ARGON2_PARALLELISM)
+    passwords.configure(*argon2_params)
+    return PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING, argon2_params)
+
+
+async def rehash_password(session_factory, user_id: int, password: str, old_hash: str):
+    """Store ``password`` hashed with the current Argon2 parameters.
+
+    Runs after a successful login. The update only applies while the stored
+    hash is still ``old_hash``, so a password changed in the meantime wins.
+    A busy hasher skips the rehash; the next login will try again.
+    """
+    try:
+        new_hash = await get_password_hasher().hash(password)
+    except HTTPException:
+        return
+
+    async with session_factory() as session:
+        await session.execute(
+            update(User).where(User.id == user_id, User.password == old_hash).values(password=new_hash)
+        )
+        await session.commit()
 
 
 def get_password_hash(password: str):
-    return pwd_context.hash(password)
+    return passwords.hash_password(password)
 
 
 def verify_password(plain_password: str, hashed_password: str):
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_password(plain_password, hashed_password)
 
 
 def create_access_token(data: dict):
@@ -32,15 +190,15 @@ def create_access_token(data: dict):
 
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({'exp': expire})
+    to_encode.update({'exp': expire, 'jti': secrets.token_hex(16)})
 
     encoded_jwt = encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
     return encoded_jwt
 
 
-def get_current_user(
-    session: Session = Depends(get_session),
+async def get_current_user(
+    session: AsyncSession = Depends(get_async_session),
     token: str = Depends(oauth2_scheme),
 ):
     credentials_exception = HTTPException(
@@ -48,20 +206,49 @@ def get_current_user(
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
-    try:
-        payload = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get('sub')
-        if not username:
+    await revocation_list.refresh_if_stale(session)
+
+    cached = token_cache.get(token)
+    if cached:
+        user, jti = cached
+    else:
+        try:
+            payload = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            username: str = payload.get('sub')
+            if not username:
+                raise credentials_exception
+
+        except ExpiredSignatureError:
             raise credentials_exception
 
-    except ExpiredSignatureError:
-        raise credentials_exception
+        except PyJWTError:
+            raise credentials_exception
 
-    except PyJWTError:
-        raise credentials_exception
+        user = await session.scalar(select(User).where(User.email == username))
 
-    user = session.scalar(select(User).where(User.email == username))
+        if not user:
+            raise credentials_exception
+
+        # Tokens issued before jti was added cannot be revoked.
+        jti = payload.get('jti')
+        token_cache.put(token, user, jti, payload['exp'])
 
-    if not user:
+    if jti and await revocation_list.is_revoked(session, jti):
         raise credentials_exception
+
     return user
+
+
+async def revoke_access_token(session: AsyncSession, token: str) -> str | None:
+    """Revoke a valid access token before it expires.
+
+    The caller commits and then passes the returned ``jti`` to
+    ``revocation_list.remember``, so a failed commit leaves this process
+    agreeing with the others that the token is still valid.
+    """
+    payload = decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    if 'jti' in payload:
+        expires_at = datetime.fromtimestamp(payload['exp'], tz=ZoneInfo('UTC'))
+        await revoke(session, payload['jti'], expires_at)
+    return payload.get('jti')
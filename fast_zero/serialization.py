@@ -0,0 +1,38 @@
+"""Opt-in fast path for the JSON bodies of list endpoints.
+
+FastAPI turns what a route returns into JSON in several passes: mapped
+dataclasses are deep-copied with ``dataclasses.asdict``, validated against
+the ``response_model``, dumped back to Python objects and finally encoded
+by the stdlib ``json`` module. With ``FAST_SERIALIZATION`` on, ``render``
+validates straight from the ORM attributes and has pydantic-core write
+the JSON bytes in the same call, using one ``TypeAdapter`` per schema
+built on first use.
+"""
+
+from functools import cache
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from fast_zero.settings import get_settings
+
+settings = get_settings()
+
+
+@cache
+def get_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def render(schema, content, exclude_unset: bool = False):
+    """Return ``content`` for FastAPI to serialise, or a ready ``Response`` when ``FAST_SERIALIZATION`` is on.
+
+    ``schema`` must be the route's ``response_model``, and ``exclude_unset``
+    its ``response_model_exclude_unset``, so both paths send the same body.
+    """
+    if not settings.FAST_SERIALIZATION:
+        return content
+
+    adapter = get_adapter(schema)
+    value = adapter.validate_python(content, from_attributes=True)
+    return Response(adapter.dump_json(value, exclude_unset=exclude_unset), media_type='application/json')
@@ -1,9 +1,66 @@
+from functools import cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
+    model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore', frozen=True)
     DATABASE_URL: str
+    DATABASE_ASYNC: bool = True
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = -1
+    DATABASE_POOL_PRE_PING: bool = False
+    SQLITE_PRAGMAS: bool = True
+    SQLITE_JOURNAL_MODE: Literal['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'] = 'WAL'
+    SQLITE_SYNCHRONOUS: Literal['OFF', 'NORMAL', 'FULL', 'EXTRA'] = 'NORMAL'
+    SQLITE_MMAP_SIZE: int = 268_435_456
+    SQLITE_CACHE_SIZE: int = -64_000
+    SQLITE_TEMP_STORE: Literal['DEFAULT', 'FILE', 'MEMORY'] = 'MEMORY'
+    SQLITE_BUSY_TIMEOUT: int = 5_000
+    SQLITE_FOREIGN_KEYS: bool = True
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 500
+    TEXT_PREVIEW_LENGTH: int = 120
+    EXPORT_BATCH_SIZE: int = 1_000
+    FAST_SERIALIZATION: bool = False
+    COMPRESSION_ENCODINGS: str = 'zstd,br,gzip'
+    COMPRESSION_MINIMUM_SIZE: int = 1_000
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    BULK_CHUNK_SIZE: int = 500
+    BULK_MAX_ITEMS: int = 10_000
+    IMPORT_MAX_REPORTED_REJECTS: int = 100
+    WRITE_COALESCING: bool = False
+    WRITE_COALESCING_MAX_DELAY_MS: int = 5
+    WRITE_COALESCING_MAX_BATCH: int = 100
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REVOCATION_BLOOM_CAPACITY: int = 100_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_REFRESH_SECONDS: float = 5
+    REVOCATION_REFRESH_OVERLAP: int = 1_000
+    # Also how long other workers may keep accepting tokens of a changed or deleted user.
+    TOKEN_CACHE_TTL_SECONDS: int = 60
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65_536
+    ARGON2_PARALLELISM: int = 4
+    LOGIN_RATE_PER_MINUTE_IP: int = 30
+    LOGIN_RATE_PER_MINUTE_ACCOUNT: int = 10
+    SIGNUP_RATE_PER_MINUTE_IP: int = 10
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    OPENAPI_SCHEMA_FILE: str | None = None
+
+
+@cache
+def get_settings() -> Settings:
+    """Read the environment and ``.env`` once; every module shares the result."""
+    return Settings()
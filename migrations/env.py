@@ -4,14 +4,14 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from fast_zero.models import table_registry
-from fast_zero.settings import Settings
+from fast_zero.settings import get_settings
 
 from alembic import context
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
-config.set_main_option('sqlalchemy.url',  Settings().DATABASE_URL)
+config.set_main_option('sqlalchemy.url',  get_settings().DATABASE_URL)
 
 
 # Interpret the config file for Python logging.
@@ -25,6 +25,12 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = table_registry.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # The FTS5 tables behind fast_zero.search are not part of the models.
+    return not (type_ == 'table' and reflected and compare_to is None and '_fts' in name)
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -47,6 +53,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +77,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
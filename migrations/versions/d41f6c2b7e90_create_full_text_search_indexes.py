@@ -0,0 +1,74 @@
+"""create full text search indexes
+
+Revision ID: d41f6c2b7e90
+Revises: b9c4a8c042f8
+Create Date: 2026-10-18 20:41:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f6c2b7e90'
+down_revision: Union[str, None] = 'b9c4a8c042f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of fast_zero.search.SEARCH_INDEXES at the time of this revision.
+SEARCH_INDEXES = [
+    ('clinical_histories', 'history_id', ('main_complaint', 'disease_history')),
+    ('clinical_examinations', 'exam_id', ('exam_details',)),
+    ('complementary_exams', 'exam_id', ('exam_details',)),
+    ('physiotherapy_diagnosis', 'diagnosis_id', ('diagnosis_details',)),
+    ('prognosis', 'prognosis_id', ('prognosis_details',)),
+    ('treatments_plan', 'plan_id', ('objectives', 'procedures')),
+]
+
+
+def upgrade_sqlite(table, pk, columns):
+    fts_table = f'{table}_fts'
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    insert = f'INSERT INTO {fts_table}(rowid, {names}) VALUES (new.{pk}, {new});'
+    delete = f"INSERT INTO {fts_table}({fts_table}, rowid, {names}) VALUES ('delete', old.{pk}, {old});"
+
+    op.execute(
+        f'CREATE VIRTUAL TABLE {fts_table} USING fts5({names}, '
+        f"content='{table}', content_rowid='{pk}', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(f'CREATE TRIGGER {table}_fts_ai AFTER INSERT ON {table} BEGIN {insert} END')
+    op.execute(f'CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} BEGIN {delete} END')
+    op.execute(f'CREATE TRIGGER {table}_fts_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END')
+    # Index the rows that already exist.
+    op.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+
+def upgrade_postgresql(table, pk, columns):
+    document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    op.execute(f"CREATE INDEX ix_{table}_fts ON {table} USING gin (to_tsvector('portuguese', {document}))")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    for table, pk, columns in SEARCH_INDEXES:
+        if dialect == 'sqlite':
+            upgrade_sqlite(table, pk, columns)
+        elif dialect == 'postgresql':
+            upgrade_postgresql(table, pk, columns)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    for table, pk, columns in SEARCH_INDEXES:
+        if dialect == 'sqlite':
+            for trigger in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{trigger}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        elif dialect == 'postgresql':
+            op.execute(f'DROP INDEX IF EXISTS ix_{table}_fts')
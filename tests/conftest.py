@@ -3,11 +3,12 @@ import factory.fuzzy
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from fast_zero.app import app
-from fast_zero.database import get_session
+from fast_zero.database import get_async_session, get_async_url, get_session_factory
 from fast_zero.models import (
     ClinicalExamination,
     ClinicalHistory,
@@ -19,7 +20,9 @@ from fast_zero.models import (
     User,
     table_registry,
 )
-from fast_zero.security import get_password_hash
+from fast_zero.ratelimit import login_account_limiter, login_ip_limiter, signup_ip_limiter
+from fast_zero.revocation import revocation_list
+from fast_zero.security import get_password_hash, token_cache
 
 
 class UserFactory(factory.Factory):
@@ -101,30 +104,47 @@ class TreatmentPlanFactory(factory.Factory):
 
 
 @pytest.fixture()
-def client(session):
-    def get_session_override():
-        return session
+def async_session_factory(session, database_url):
+    """Async sessions on the test database; its engine is ``async_session_factory.kw['bind']``."""
+    async_engine = create_async_engine(get_async_url(database_url), poolclass=NullPool)
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+@pytest.fixture()
+def client(async_session_factory):
+    async def get_session_override():
+        async with async_session_factory() as async_session:
+            yield async_session
 
     with TestClient(app) as client:
-        app.dependency_overrides[get_session] = get_session_override
+        app.dependency_overrides[get_async_session] = get_session_override
+        app.dependency_overrides[get_session_factory] = lambda: async_session_factory
         yield client
 
     app.dependency_overrides.clear()
+    token_cache.clear()
+    revocation_list.reset()
+    for limiter in (login_ip_limiter, login_account_limiter, signup_ip_limiter):
+        limiter.reset()
 
 
 @pytest.fixture()
-def session():
-    engine = create_engine(
-        'sqlite:///:memory:',
-        connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
-    )
+def database_url(tmp_path):
+    # The app talks to the database through an async engine while the tests
+    # seed it with a sync one, so both need to open the same file.
+    return f'sqlite:///{tmp_path / "test.db"}'
+
+
+@pytest.fixture()
+def session(database_url):
+    engine = create_engine(database_url)
     table_registry.metadata.create_all(engine)
 
     with Session(engine) as session:
         yield session
 
     table_registry.metadata.drop_all(engine)
+    engine.dispose()
 
 
 @pytest.fixture()
@@ -1,6 +1,14 @@
 from http import HTTPStatus
 
+import pytest
 from freezegun import freeze_time
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy import event, exc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fast_zero.models import RefreshToken
+from fast_zero.passwords import needs_rehash, verify_password
+from fast_zero.refresh_tokens import hash_refresh_token
 
 
 def test_get_token(client, user):
@@ -88,3 +96,166 @@ def test_token_expired_dont_refresh(client, user):
         )
         assert response.status_code == HTTPStatus.UNAUTHORIZED
         assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_login_rehashes_passwords_with_stale_parameters(session, client, user):
+    stale_hash = Argon2Hasher(time_cost=1, memory_cost=8, parallelism=1).hash(user.clean_password)
+    user.password = stale_hash
+    session.commit()
+
+    response = client.post('/auth/token', data={'username': user.email, 'password': user.clean_password})
+
+    assert response.status_code == HTTPStatus.OK
+    session.refresh(user)
+    assert user.password != stale_hash
+    assert not needs_rehash(user.password)
+    assert verify_password(user.clean_password, user.password)
+
+
+def test_login_keeps_passwords_with_current_parameters(session, client, user):
+    current_hash = user.password
+
+    client.post('/auth/token', data={'username': user.email, 'password': user.clean_password})
+
+    session.refresh(user)
+    assert user.password == current_hash
+
+
+def login(client, user):
+    response = client.post('/auth/token', data={'username': user.email, 'password': user.clean_password})
+    return response.json()
+
+
+def test_login_issues_a_refresh_token(client, user):
+    assert login(client, user)['refresh_token']
+
+
+def test_refresh_renews_an_expired_access_token(client, user):
+    with freeze_time('2023-07-14 12:00:00'):
+        tokens = login(client, user)
+
+    with freeze_time('2023-07-14 13:00:00'):
+        response = client.post('/auth/refresh', json={'refresh_token': tokens['refresh_token']})
+        assert response.status_code == HTTPStatus.OK
+        renewed = response.json()
+
+        response = client.post('/auth/refresh_token', headers={'Authorization': f'Bearer {renewed["access_token"]}'})
+        assert response.status_code == HTTPStatus.OK
+
+    assert renewed['refresh_token'] != tokens['refresh_token']
+
+
+def test_refresh_token_reuse_revokes_the_family(client, user):
+    first = login(client, user)['refresh_token']
+    second = client.post('/auth/refresh', json={'refresh_token': first}).json()['refresh_token']
+
+    reused = client.post('/auth/refresh', json={'refresh_token': first})
+    after_reuse = client.post('/auth/refresh', json={'refresh_token': second})
+
+    assert reused.status_code == HTTPStatus.UNAUTHORIZED
+    assert after_reuse.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_refresh_token_expires(client, user):
+    with freeze_time('2023-07-14 12:00:00'):
+        tokens = login(client, user)
+
+    with freeze_time('2023-09-14 12:00:00'):
+        response = client.post('/auth/refresh', json={'refresh_token': tokens['refresh_token']})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_refresh_with_unknown_token(client):
+    response = client.post('/auth/refresh', json={'refresh_token': 'made-up'})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_changing_the_password_revokes_refresh_tokens(client, user):
+    tokens = login(client, user)
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+        json={'username': user.username, 'email': user.email, 'password': 'new-password'},
+    )
+
+    response = client.post('/auth/refresh', json={'refresh_token': tokens['refresh_token']})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_changing_the_password_commits_once(client, async_session_factory, user):
+    tokens = login(client, user)
+    commits = []
+    event.listen(async_session_factory.kw['bind'].sync_engine, 'commit', commits.append)
+
+    response = client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+        json={'username': user.username, 'email': user.email, 'password': 'new-password'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(commits) == 1
+
+
+def test_refresh_tokens_are_stored_hashed(session, client, user):
+    token = login(client, user)['refresh_token']
+
+    stored = session.scalar(select(RefreshToken))
+
+    assert stored.token_hash == hash_refresh_token(token)
+    assert token not in stored.token_hash
+
+
+def test_logout_revokes_the_access_token(client, user):
+    tokens = login(client, user)
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+
+    response = client.post('/auth/logout', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'message': 'Logged out'}
+
+    response = client.post('/auth/refresh_token', headers=headers)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_failed_logout_leaves_the_access_token_valid(client, user, monkeypatch):
+    tokens = login(client, user)
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+
+    async def fail_commit(session):
+        raise exc.OperationalError('COMMIT', {}, Exception('disk I/O error'))
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncSession, 'commit', fail_commit)
+        with pytest.raises(exc.OperationalError):
+            client.post('/auth/logout', headers=headers)
+
+    response = client.post('/auth/refresh_token', headers=headers)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_logout_revokes_the_refresh_token(client, user):
+    tokens = login(client, user)
+
+    client.post(
+        '/auth/logout',
+        headers={'Authorization': f'Bearer {tokens["access_token"]}'},
+        json={'refresh_token': tokens['refresh_token']},
+    )
+    response = client.post('/auth/refresh', json={'refresh_token': tokens['refresh_token']})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_logout_leaves_other_sessions_alone(client, user):
+    first = login(client, user)
+    second = login(client, user)
+
+    client.post('/auth/logout', headers={'Authorization': f'Bearer {first["access_token"]}'})
+    response = client.post('/auth/refresh_token', headers={'Authorization': f'Bearer {second["access_token"]}'})
+
+    assert response.status_code == HTTPStatus.OK
@@ -52,6 +52,20 @@ def test_list_clinical_examinations_filter_exam_details_should_return_5_clinical
     assert len(response.json()['clinical_examinations']) == expected_clinical_examinations
 
 
+def test_list_clinical_examinations_filter_patient_id_should_return_3_clinical_examinations(session, client, token):
+    expected_clinical_examinations = 3
+    session.bulk_save_objects(ClinicalExaminationFactory.create_batch(3, patient_id=2))
+    session.bulk_save_objects(ClinicalExaminationFactory.create_batch(5, patient_id=1))
+    session.commit()
+
+    response = client.get(
+        '/clinical-examination/?patient_id=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['clinical_examinations']) == expected_clinical_examinations
+
+
 def test_delete_clinical_examination(session, client, token):
     clinical_examination = ClinicalExaminationFactory()
     session.add(clinical_examination)
@@ -122,6 +122,20 @@ def test_list_clinical_history_filter_other_information_should_return_5_clinical
     assert len(response.json()['clinical_histories']) == expected_clinical_histories
 
 
+def test_list_clinical_history_filter_patient_id_should_return_3_clinical_history(session, client, token):
+    expected_clinical_histories = 3
+    session.bulk_save_objects(ClinicalHistoryFactory.create_batch(3, patient_id=2))
+    session.bulk_save_objects(ClinicalHistoryFactory.create_batch(5, patient_id=1))
+    session.commit()
+
+    response = client.get(
+        '/clinical-history/?patient_id=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['clinical_histories']) == expected_clinical_histories
+
+
 def test_delete_clinical_history(session, client, token):
     clinical_history = ClinicalHistoryFactory()
     session.add(clinical_history)
@@ -169,3 +183,26 @@ def test_patch_clinic_history_error(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Clinical History not found.'}
+
+
+def test_bulk_create_clinical_histories(client, token, patient):
+    history = {
+        'patient_id': patient.id,
+        'main_complaint': 'Dor lombar',
+        'disease_history': 'Há 3 meses',
+        'lifestyle_habits': 'Sedentária',
+        'previous_treatments': 'Nenhum',
+        'personal_family_history': 'Nada consta',
+        'other_information': 'Nenhuma',
+    }
+    invalid = {key: value for key, value in history.items() if key != 'main_complaint'}
+
+    response = client.post(
+        '/clinical-history/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[history, invalid, history],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['ids'] == [1, None, 2]
+    assert [error['index'] for error in response.json()['errors']] == [1]
@@ -0,0 +1,85 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event, exc, func, select
+
+from fast_zero.app import app
+from fast_zero.coalescer import WriteCoalescer, get_write_coalescer
+from fast_zero.models import Patient, User
+from tests.conftest import PatientFactory
+
+
+@pytest.fixture()
+def coalescer(async_session_factory):
+    coalescer = WriteCoalescer(async_session_factory, max_delay=0.05, max_batch=100)
+    coalescer.commits = []
+    event.listen(async_session_factory.kw['bind'].sync_engine, 'commit', coalescer.commits.append)
+
+    return coalescer
+
+
+def test_concurrent_inserts_share_one_commit(session, coalescer):
+    async def submit_all():
+        patients = await asyncio.gather(*(coalescer.submit(PatientFactory()) for _ in range(10)))
+        await coalescer.close()
+        return patients
+
+    patients = asyncio.run(submit_all())
+
+    assert sorted(patient.id for patient in patients) == list(range(1, 11))
+    assert len(coalescer.commits) == 1
+    assert session.scalar(select(func.count()).select_from(Patient)) == len(patients)
+
+
+def test_failing_row_only_fails_its_caller(session, coalescer):
+    async def submit_all():
+        results = await asyncio.gather(
+            coalescer.submit(User(username='maria', email='maria@test.com', password='secret')),
+            coalescer.submit(User(username='maria', email='other@test.com', password='secret')),
+            coalescer.submit(User(username='joao', email='joao@test.com', password='secret')),
+            return_exceptions=True,
+        )
+        await coalescer.close()
+        return results
+
+    first, duplicated, last = asyncio.run(submit_all())
+
+    assert first.id
+    assert isinstance(duplicated, exc.IntegrityError)
+    assert last.id
+    assert session.scalars(select(User.username).order_by(User.id)).all() == ['maria', 'joao']
+
+
+def test_close_commits_the_batch_in_flight(session, coalescer):
+    coalescer.max_delay = 60
+
+    async def submit_then_close():
+        submitted = [asyncio.create_task(coalescer.submit(PatientFactory())) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(coalescer.close(), timeout=5)
+        return await asyncio.wait_for(asyncio.gather(*submitted), timeout=5)
+
+    patients = asyncio.run(submit_then_close())
+
+    assert sorted(patient.id for patient in patients) == [1, 2, 3]
+    assert len(coalescer.commits) == 1
+
+
+def test_submit_after_close_is_refused(coalescer):
+    async def close_then_submit():
+        await coalescer.close()
+        await coalescer.submit(PatientFactory())
+
+    with pytest.raises(RuntimeError, match='closed'):
+        asyncio.run(close_then_submit())
+
+
+def test_create_route_goes_through_coalescer(client, coalescer):
+    app.dependency_overrides[get_write_coalescer] = lambda: coalescer
+
+    response = client.post('/prognosis/', json={'patient_id': 1, 'prognosis_details': 'Bom'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'prognosis_id': 1, 'patient_id': 1, 'prognosis_details': 'Bom'}
+    assert len(coalescer.commits) == 1
@@ -52,6 +52,20 @@ def test_list_complementary_exams_filter_exam_details_should_return_5_complement
     assert len(response.json()['complementary_exams']) == expected_complementary_exams
 
 
+def test_list_complementary_exams_filter_patient_id_should_return_3_complementary_exams(session, client, token):
+    expected_complementary_exams = 3
+    session.bulk_save_objects(ComplementaryExamFactory.create_batch(3, patient_id=2))
+    session.bulk_save_objects(ComplementaryExamFactory.create_batch(5, patient_id=1))
+    session.commit()
+
+    response = client.get(
+        '/complementary-exams/?patient_id=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['complementary_exams']) == expected_complementary_exams
+
+
 def test_delete_complementary_exam(session, client, token):
     complementary_exam = ComplementaryExamFactory()
     session.add(complementary_exam)
@@ -0,0 +1,175 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from fast_zero import compression
+from tests.conftest import PatientFactory
+
+TEXT = 'Paciente relata dor lombar há três meses, com piora ao final do dia. ' * 20
+
+DECOMPRESSORS = {'gzip': gzip.decompress}
+if compression.brotli is not None:
+    DECOMPRESSORS['br'] = compression.brotli.decompress
+if compression.zstandard is not None:
+    DECOMPRESSORS['zstd'] = lambda data: compression.zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+@pytest.fixture()
+def small_app():
+    app = FastAPI()
+
+    @app.get('/text')
+    def read_text(size: int):
+        return PlainTextResponse(TEXT[:size])
+
+    @app.get('/varies')
+    def read_varies():
+        return PlainTextResponse(TEXT, headers={'Vary': 'accept-encoding, Origin'})
+
+    @app.get('/stream')
+    def read_stream():
+        return StreamingResponse(iter([TEXT.encode(), b'', TEXT.encode()]), media_type='text/plain')
+
+    @app.get('/image')
+    def read_image():
+        return Response(TEXT.encode(), media_type='image/png')
+
+    @app.get('/empty', status_code=HTTPStatus.NO_CONTENT)
+    def read_empty():
+        return Response(status_code=HTTPStatus.NO_CONTENT)
+
+    app.add_middleware(compression.CompressionMiddleware, encodings={'gzip': 6}, minimum_size=100)
+    return app
+
+
+def raw_get(app, url, accept_encoding='gzip'):
+    """The response body as sent, without httpx decoding it."""
+    with TestClient(app) as client, client.stream('GET', url, headers={'Accept-Encoding': accept_encoding}) as response:
+        return response, b''.join(response.iter_raw())
+
+
+@pytest.mark.parametrize(
+    ('accept_encoding', 'expected_encoding'),
+    [
+        ('gzip, deflate, br, zstd', 'zstd'),
+        ('gzip;q=1.0, br;q=0.5', 'gzip'),
+        ('br;q=0.2, GZIP;q=0.8', 'gzip'),
+        ('*', 'zstd'),
+        ('*, zstd;q=0', 'br'),
+        ('gzip;q=0', None),
+        ('identity', None),
+        ('', None),
+    ],
+)
+def test_negotiate(accept_encoding, expected_encoding):
+    assert compression.negotiate(accept_encoding, ['zstd', 'br', 'gzip']) == expected_encoding
+
+
+@pytest.mark.parametrize('encoding', sorted(compression.CODECS))
+def test_codecs_round_trip_in_chunks(encoding):
+    compressor = compression.CODECS[encoding](3)
+    chunks = [compressor.compress(TEXT.encode()), compressor.compress(TEXT.encode()), compressor.finish()]
+
+    assert all(chunks[:2])
+    assert DECOMPRESSORS[encoding](b''.join(chunks)) == (TEXT * 2).encode()
+
+
+def test_configured_encodings_follow_settings(monkeypatch):
+    monkeypatch.setattr(
+        compression,
+        'settings',
+        compression.settings.model_copy(
+            update={'COMPRESSION_ENCODINGS': 'gzip, lzma', 'COMPRESSION_GZIP_LEVEL': 9},
+        ),
+    )
+
+    assert compression.configured_encodings() == {'gzip': 9}
+
+
+def test_compresses_large_body(small_app):
+    response, raw = raw_get(small_app, f'/text?size={len(TEXT)}')
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert int(response.headers['Content-Length']) == len(raw)
+    assert gzip.decompress(raw).decode() == TEXT
+
+
+def test_leaves_small_body_alone(small_app):
+    response, raw = raw_get(small_app, '/text?size=50')
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert raw.decode() == TEXT[:50]
+
+
+def test_leaves_body_alone_without_accepted_encoding(small_app):
+    response, raw = raw_get(small_app, f'/text?size={len(TEXT)}', accept_encoding='identity')
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert raw.decode() == TEXT
+
+
+def test_leaves_incompressible_types_alone(small_app):
+    response, _ = raw_get(small_app, '/image')
+
+    assert 'Content-Encoding' not in response.headers
+    assert 'Vary' not in response.headers
+
+
+def test_does_not_repeat_vary(small_app):
+    response, _ = raw_get(small_app, '/varies')
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'accept-encoding, Origin'
+
+
+def test_leaves_no_content_alone(small_app):
+    response, raw = raw_get(small_app, '/empty')
+
+    assert response.status_code == HTTPStatus.NO_CONTENT
+    assert 'Content-Encoding' not in response.headers
+    assert not raw
+
+
+def test_compresses_streaming_body(small_app):
+    response, raw = raw_get(small_app, '/stream')
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    assert gzip.decompress(raw).decode() == TEXT * 2
+
+
+def test_app_compresses_list_pages(session, client, token):
+    expected_patients = 20
+    session.bulk_save_objects(PatientFactory.create_batch(expected_patients))
+    session.commit()
+
+    response = client.get('/patients/', headers={'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len(response.json()['patients']) == expected_patients
+
+
+def test_app_compresses_exports(session, client):
+    expected_rows = 50
+    session.bulk_save_objects(PatientFactory.create_batch(expected_rows))
+    session.commit()
+
+    response = client.get('/patients/export', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert len([json.loads(line) for line in response.text.splitlines()]) == expected_rows
+
+
+def test_app_does_not_compress_precompressed_openapi(client):
+    response = client.get('/openapi.json', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.json()['openapi']
@@ -0,0 +1,125 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from fast_zero import crud
+from fast_zero.crud import bulk_insert, delete_by_pk, insert_returning, update_returning
+from fast_zero.database import set_sqlite_pragmas
+from fast_zero.models import Patient, Prognosis
+from fast_zero.schemas import PatientSchema, PrognosisSchema
+from tests.conftest import PatientFactory
+
+
+@pytest.fixture()
+def session_factory(async_session_factory):
+    engine = async_session_factory.kw['bind'].sync_engine
+    async_session_factory.statements = []
+    async_session_factory.commits = []
+
+    def log(conn, cursor, statement, *args):
+        async_session_factory.statements.append(statement.split()[0].upper())
+
+    event.listen(engine, 'before_cursor_execute', log)
+    event.listen(engine, 'commit', async_session_factory.commits.append)
+    event.listen(engine, 'connect', set_sqlite_pragmas)
+
+    return async_session_factory
+
+
+def run(session_factory, write):
+    async def run_write():
+        async with session_factory() as async_session:
+            return await write(async_session)
+
+    return asyncio.run(run_write())
+
+
+def test_insert_returning_is_a_single_statement(session_factory):
+    patient = run(session_factory, lambda async_session: insert_returning(async_session, PatientFactory()))
+
+    assert patient.id == 1
+    assert session_factory.statements == ['INSERT']
+
+
+def test_update_returning_is_a_single_statement(session, session_factory, patient):
+    expected_age = 30
+
+    updated = run(
+        session_factory,
+        lambda async_session: update_returning(
+            async_session, Patient, patient.id, {'age': expected_age, 'limit': 10}, 'Patient not found.'
+        ),
+    )
+
+    assert updated.age == expected_age
+    assert updated.full_name == patient.full_name
+    assert session_factory.statements == ['UPDATE']
+
+
+def test_update_returning_without_values_reads_the_row(session_factory, patient):
+    updated = run(
+        session_factory,
+        lambda async_session: update_returning(async_session, Patient, patient.id, {}, 'Patient not found.'),
+    )
+
+    assert updated.id == patient.id
+    assert session_factory.statements == ['SELECT']
+
+
+def test_update_returning_missing_row(session_factory):
+    with pytest.raises(HTTPException) as exc_info:
+        run(
+            session_factory,
+            lambda async_session: update_returning(async_session, Patient, 10, {'age': 30}, 'Patient not found.'),
+        )
+
+    assert exc_info.value.status_code == HTTPStatus.NOT_FOUND
+    assert exc_info.value.detail == 'Patient not found.'
+
+
+def test_delete_by_pk_is_a_single_statement(session_factory, patient):
+    run(session_factory, lambda async_session: delete_by_pk(async_session, Patient, patient.id, 'Patient not found.'))
+
+    assert session_factory.statements == ['DELETE']
+
+
+def test_delete_by_pk_missing_row(session_factory):
+    with pytest.raises(HTTPException) as exc_info:
+        run(session_factory, lambda async_session: delete_by_pk(async_session, Patient, 10, 'Patient not found.'))
+
+    assert exc_info.value.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_bulk_insert_commits_once_per_chunk(session_factory, monkeypatch):
+    expected_ids = [1, 2, 3, 4, 5]
+    expected_commits = 3
+    monkeypatch.setattr(crud, 'settings', crud.settings.model_copy(update={'BULK_CHUNK_SIZE': 2}))
+    items = [PatientSchema.model_validate(PatientFactory(), from_attributes=True).model_dump() for _ in range(5)]
+
+    result = run(session_factory, lambda async_session: bulk_insert(async_session, Patient, PatientSchema, items))
+
+    assert result == {'ids': expected_ids, 'errors': []}
+    assert len(session_factory.commits) == expected_commits
+
+
+def test_bulk_insert_too_many_items(session_factory, monkeypatch):
+    monkeypatch.setattr(crud, 'settings', crud.settings.model_copy(update={'BULK_MAX_ITEMS': 1}))
+
+    with pytest.raises(HTTPException) as exc_info:
+        run(session_factory, lambda async_session: bulk_insert(async_session, Patient, PatientSchema, [{}, {}]))
+
+    assert exc_info.value.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_bulk_insert_isolates_rows_the_database_rejects(session_factory, patient):
+    items = [{'patient_id': patient_id, 'prognosis_details': 'Bom'} for patient_id in (patient.id, 42, patient.id)]
+
+    result = run(session_factory, lambda async_session: bulk_insert(async_session, Prognosis, PrognosisSchema, items))
+
+    assert result == {
+        'ids': [1, None, 2],
+        'errors': [{'index': 1, 'detail': 'Conflicts with the data already stored.'}],
+    }
@@ -0,0 +1,53 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+from fast_zero import export
+from fast_zero.app import app
+from fast_zero.database import ThreadedSession, get_session_factory
+from tests.conftest import PatientFactory, TreatmentPlanFactory
+
+
+def test_export_patients_ndjson(session, client):
+    session.bulk_save_objects(PatientFactory.create_batch(3))
+    session.commit()
+
+    response = client.get('/patients/export')
+    rows = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert response.headers['content-disposition'] == 'attachment; filename="patients.ndjson"'
+    assert [row['id'] for row in rows] == [1, 2, 3]
+
+
+def test_export_treatment_plans_csv_filtered_by_patient(session, client):
+    session.add(TreatmentPlanFactory(patient_id=1, objectives='Fortalecer, alongar', probable_sessions=10))
+    session.add(TreatmentPlanFactory(patient_id=2))
+    session.commit()
+
+    response = client.get('/treatment-plan/export?format=csv&patient_id=1')
+    header, row = csv.reader(StringIO(response.text))
+
+    assert response.headers['content-type'] == 'text/csv; charset=utf-8'
+    assert header == ['patient_id', 'objectives', 'probable_sessions', 'procedures', 'plan_id']
+    assert row[:3] == ['1', 'Fortalecer, alongar', '10']
+
+
+def test_export_streams_in_batches_with_threaded_session(session, client, monkeypatch):
+    expected_rows = 5
+    monkeypatch.setattr(export, 'settings', export.settings.model_copy(update={'EXPORT_BATCH_SIZE': 2}))
+    session.bulk_save_objects(PatientFactory.create_batch(expected_rows))
+    session.commit()
+    app.dependency_overrides[get_session_factory] = lambda: lambda: ThreadedSession(session)
+
+    response = client.get('/patients/export')
+
+    assert len(response.text.splitlines()) == expected_rows
+
+
+def test_export_rejects_unknown_format(client):
+    response = client.get('/prognosis/export?format=xml')
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,145 @@
+import asyncio
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import func, select
+
+from fast_zero import importer
+from fast_zero.models import ClinicalHistory, Patient
+
+PATIENT_CSV = (
+    'full_name,age,place_of_birth,marital_status,gender,profession,residential_address,commercial_address\n'
+    'Maria Aparecida,58,Rio de Janeiro-RJ,Casada,Feminino,Professora,"Rua X, 345","Rua Y, 600"\n'
+    'João da Silva,not a number,Niterói-RJ,Solteiro,Masculino,Pedreiro,"Rua Z, 10","Rua W, 20"\n'
+    'Ana Souza,34,São Paulo-SP,Solteira,Feminino,Engenheira,"Rua A, 1","Rua B, 2"\n'
+)
+
+
+@pytest.fixture()
+def session_factory(async_session_factory, monkeypatch):
+    monkeypatch.setattr(importer, 'new_async_session', async_session_factory)
+    return async_session_factory
+
+
+def history(patient_id, **overrides):
+    return {
+        'patient_id': patient_id,
+        'main_complaint': 'Dor lombar',
+        'disease_history': 'Há 3 meses',
+        'lifestyle_habits': 'Sedentária',
+        'previous_treatments': 'Nenhum',
+        'personal_family_history': 'Nada consta',
+        'other_information': 'Nenhuma',
+        **overrides,
+    }
+
+
+def test_read_rows_csv_turns_empty_cells_into_none():
+    rows = list(importer.read_rows(io.StringIO('a,b\n1,\n'), 'csv'))
+
+    assert rows == [{'a': '1', 'b': None}]
+
+
+def test_read_rows_jsonl_keeps_unparseable_lines():
+    rows = list(importer.read_rows(io.StringIO('{"a": 1}\n\n{broken\n'), 'jsonl'))
+
+    assert rows == [{'a': 1}, '{broken']
+
+
+def test_import_file_writes_rejects(session, session_factory, tmp_path):
+    expected_imported = 2
+    source = tmp_path / 'patients.csv'
+    source.write_text(PATIENT_CSV, encoding='utf-8')
+
+    report = asyncio.run(importer.import_file('patients', source, 'csv'))
+
+    assert (report.processed, report.imported, report.rejected) == (3, expected_imported, 1)
+    assert report.rows_per_second > 0
+    assert session.scalars(select(Patient.full_name).order_by(Patient.id)).all() == ['Maria Aparecida', 'Ana Souza']
+    [reject] = [json.loads(line) for line in (tmp_path / 'patients.csv.rejects.jsonl').read_text().splitlines()]
+    assert reject['row'] == expected_imported
+    assert reject['detail'][0]['loc'] == ['age']
+    assert not (tmp_path / 'patients.csv.checkpoint').exists()
+
+
+def test_import_file_resumes_from_checkpoint(session, session_factory, tmp_path, monkeypatch, patient):
+    monkeypatch.setattr(importer, 'settings', importer.settings.model_copy(update={'BULK_CHUNK_SIZE': 2}))
+    source = tmp_path / 'histories.jsonl'
+    source.write_text(''.join(json.dumps(history(patient.id)) + '\n' for _ in range(5)), encoding='utf-8')
+    (tmp_path / 'histories.jsonl.checkpoint').write_text(json.dumps({'processed': 4}), encoding='utf-8')
+
+    report = asyncio.run(importer.import_file('clinical-history', source, 'jsonl'))
+
+    assert (report.processed, report.imported) == (5, 1)
+    assert session.scalar(select(func.count()).select_from(ClinicalHistory)) == 1
+
+
+def test_import_rows_checkpoints_after_every_chunk(session_factory, monkeypatch, patient):
+    monkeypatch.setattr(importer, 'settings', importer.settings.model_copy(update={'BULK_CHUNK_SIZE': 2}))
+
+    class Log(importer.ImportLog):
+        checkpoints = []
+
+        def checkpoint(self, processed):
+            self.checkpoints.append(processed)
+
+    async def run_import():
+        async with session_factory() as async_session:
+            rows = [history(patient.id) for _ in range(5)]
+            return await importer.import_rows(async_session, 'clinical-history', rows, log=Log())
+
+    asyncio.run(run_import())
+
+    assert Log.checkpoints == [2, 4, 5]
+
+
+def test_import_endpoint(session, client):
+    response = client.post(
+        '/import/patients',
+        files={'file': ('patients.csv', PATIENT_CSV.encode(), 'text/csv')},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    report = response.json()
+    assert (report['processed'], report['imported'], report['rejected']) == (3, 2, 1)
+    assert [reject['row'] for reject in report['rejects']] == [2]
+    assert session.scalar(select(func.count()).select_from(Patient)) == report['imported']
+
+
+def test_import_endpoint_parses_off_the_event_loop(session, client, monkeypatch):
+    validate_items = importer.validate_items
+    on_event_loop = []
+
+    def record_thread(schema, batch):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return validate_items(schema, batch)
+
+    monkeypatch.setattr(importer, 'validate_items', record_thread)
+
+    response = client.post('/import/patients', files={'file': ('patients.csv', PATIENT_CSV.encode(), 'text/csv')})
+
+    assert response.status_code == HTTPStatus.OK
+    assert on_event_loop == [False]
+
+
+def test_import_endpoint_skip_resumes(session, client):
+    response = client.post(
+        '/import/patients?skip=2',
+        files={'file': ('patients.csv', PATIENT_CSV.encode(), 'text/csv')},
+    )
+
+    assert response.json()['imported'] == 1
+    assert session.scalars(select(Patient.full_name)).all() == ['Ana Souza']
+
+
+def test_import_endpoint_unknown_resource(client):
+    response = client.post('/import/users', files={'file': ('users.csv', b'', 'text/csv')})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Resource cannot be imported.'}
@@ -0,0 +1,94 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import create_engine, event, exc
+
+from fast_zero import database
+from fast_zero.database import InstrumentedQueuePool, pool_checkout_seconds, pool_checkout_timeouts
+from fast_zero.metrics import Registry
+
+
+def test_registry_renders_counter_and_histogram():
+    registry = Registry()
+    counter = registry.counter('requests_total', 'Requests served.')
+    histogram = registry.histogram('latency_seconds', 'Request latency.', buckets=(0.1, 1.0))
+
+    counter.inc()
+    counter.inc(2)
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+
+    assert registry.render().splitlines() == [
+        '# HELP requests_total Requests served.',
+        '# TYPE requests_total counter',
+        'requests_total 3',
+        '# HELP latency_seconds Request latency.',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1.0"} 2',
+        'latency_seconds_bucket{le="+Inf"} 2',
+        'latency_seconds_sum 0.55',
+        'latency_seconds_count 2',
+    ]
+
+
+def test_instrumented_pool_counts_checkout_timeouts(database_url):
+    engine = create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.01,
+    )
+    expected_timeouts = pool_checkout_timeouts.value + 1
+    expected_checkouts = pool_checkout_seconds.count + 2
+
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    assert pool_checkout_timeouts.value == expected_timeouts
+    assert pool_checkout_seconds.count == expected_checkouts
+    engine.dispose()
+
+
+def test_checkout_wait_leaves_out_opening_connections(database_url):
+    connect_seconds = 0.2
+    engine = create_engine(database_url, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0)
+    event.listen(engine, 'connect', lambda *args: time.sleep(connect_seconds))
+    waited = pool_checkout_seconds.sum
+
+    with engine.connect():
+        pass
+
+    assert pool_checkout_seconds.sum - waited < connect_seconds
+    engine.dispose()
+
+
+def test_metrics_endpoint_exposes_pool_stats(client):
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'db_pool_checked_out ' in response.text
+    assert 'db_pool_checkout_timeouts_total ' in response.text
+
+
+@pytest.mark.parametrize('database_async', [True, False])
+def test_metrics_with_in_memory_sqlite(client, monkeypatch, database_async):
+    monkeypatch.setattr(
+        database,
+        'settings',
+        database.settings.model_copy(update={'DATABASE_URL': 'sqlite:///:memory:', 'DATABASE_ASYNC': database_async}),
+    )
+    database.get_engine.cache_clear()
+    database.get_async_engine.cache_clear()
+    try:
+        response = client.get('/metrics')
+    finally:
+        database.get_engine.cache_clear()
+        database.get_async_engine.cache_clear()
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'db_pool_size 0' in response.text.splitlines()
+    assert 'db_pool_checked_out 0' in response.text.splitlines()
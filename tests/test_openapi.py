@@ -0,0 +1,112 @@
+import gzip
+import json
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+
+from fast_zero.openapi import OpenAPIDocument, load_openapi, main
+
+
+def test_openapi_is_built_at_startup(client):
+    assert isinstance(client.app.state.openapi_document, OpenAPIDocument)
+
+
+def test_openapi_served_with_etag(client):
+    response = client.get('/openapi.json', headers={'Accept-Encoding': 'identity'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] == client.app.state.openapi_document.etag
+    assert 'Content-Encoding' not in response.headers
+    assert '/patients/' in response.json()['paths']
+
+
+def test_openapi_served_gzipped(client):
+    response = client.get('/openapi.json', headers={'Accept-Encoding': 'gzip, br'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert response.content == client.app.state.openapi_document.body
+
+
+def test_openapi_gzip_refused_with_zero_quality(client):
+    response = client.get('/openapi.json', headers={'Accept-Encoding': 'gzip;q=0'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['ETag'] == client.app.state.openapi_document.etag
+
+
+def test_openapi_encodings_have_their_own_etags(client):
+    document = client.app.state.openapi_document
+    gzipped = client.get('/openapi.json', headers={'Accept-Encoding': 'gzip'})
+
+    response = client.get('/openapi.json', headers={'Accept-Encoding': 'gzip', 'If-None-Match': document.etag})
+
+    assert gzipped.headers['ETag'] == document.gzip_etag
+    assert document.etag.startswith('W/')
+    assert document.etag != document.gzip_etag
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_openapi_recompressed_body_keeps_the_weak_etag(client):
+    pytest.importorskip('brotli')
+    document = client.app.state.openapi_document
+
+    response = client.get('/openapi.json', headers={'Accept-Encoding': 'br'})
+    revalidated = client.get('/openapi.json', headers={'Accept-Encoding': 'br', 'If-None-Match': document.etag})
+
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.headers['ETag'] == document.etag
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_openapi_not_modified(client):
+    etag = client.get('/openapi.json').headers['ETag']
+
+    response = client.get('/openapi.json', headers={'If-None-Match': f'"other", {etag}'})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers['ETag'] == etag
+    assert not response.content
+
+
+def test_docs_pages_point_at_the_cached_schema(client):
+    assert "url: '/openapi.json'" in client.get('/docs').text
+    assert client.get('/docs/oauth2-redirect').status_code == HTTPStatus.OK
+    assert 'spec-url="/openapi.json"' in client.get('/redoc').text
+
+
+def test_openapi_gzip_is_deterministic():
+    first = OpenAPIDocument(b'{"openapi":"3.1.0"}')
+    second = OpenAPIDocument(b'{"openapi":"3.1.0"}')
+
+    assert first.gzipped == second.gzipped
+    assert first.etag == second.etag
+    assert gzip.decompress(first.gzipped) == first.body
+
+
+def test_openapi_read_from_schema_file(tmp_path):
+    schema_file = tmp_path / 'openapi.json'
+    schema_file.write_text('{"openapi":"3.1.0","paths":{}}')
+
+    document = load_openapi(FastAPI(), str(schema_file))
+
+    assert document.body == schema_file.read_bytes()
+
+
+def test_openapi_generated_without_schema_file(tmp_path):
+    app = FastAPI()
+
+    document = load_openapi(app, str(tmp_path / 'missing.json'))
+
+    assert load_openapi(app) is document
+    assert json.loads(document.body)['info']['title'] == app.title
+
+
+def test_openapi_command_writes_the_schema(tmp_path, client):
+    output = tmp_path / 'openapi.json'
+
+    main([str(output)])
+
+    assert output.read_bytes() == client.app.state.openapi_document.body
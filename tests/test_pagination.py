@@ -0,0 +1,77 @@
+import asyncio
+from http import HTTPStatus
+
+from sqlalchemy import select
+
+from fast_zero.database import ThreadedSession
+from fast_zero.models import Prognosis, User
+from fast_zero.pagination import decode_cursor, encode_cursor, fetch_page, select_rows, settings
+from tests.conftest import PatientFactory, PrognosisFactory
+
+
+def test_cursor_round_trip():
+    expected_pk = 42
+
+    assert decode_cursor(encode_cursor(expected_pk)) == expected_pk
+
+
+def test_list_walks_every_page_with_cursor(session, client):
+    session.bulk_save_objects(PrognosisFactory.create_batch(5))
+    session.commit()
+
+    first_page = client.get('/prognosis/?limit=2').json()
+    second_page = client.get(f'/prognosis/?limit=2&after={first_page["next_cursor"]}').json()
+    last_page = client.get(f'/prognosis/?limit=2&after={second_page["next_cursor"]}').json()
+
+    assert [item['prognosis_id'] for item in first_page['prognosis']] == [1, 2]
+    assert [item['prognosis_id'] for item in second_page['prognosis']] == [3, 4]
+    assert [item['prognosis_id'] for item in last_page['prognosis']] == [5]
+    assert last_page['next_cursor'] is None
+
+
+def test_list_page_size_is_capped(session, client):
+    session.bulk_save_objects(PatientFactory.create_batch(settings.PAGE_SIZE_MAX + 1))
+    session.commit()
+
+    response = client.get(f'/patients/?limit={settings.PAGE_SIZE_MAX * 2}')
+
+    assert len(response.json()['patients']) == settings.PAGE_SIZE_MAX
+    assert response.json()['next_cursor'] == encode_cursor(settings.PAGE_SIZE_MAX)
+
+
+def test_list_invalid_cursor(client):
+    response = client.get('/clinical-history/?after=not-a-cursor')
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Invalid cursor.'}
+
+
+def test_select_rows_skips_the_identity_map(session):
+    session.bulk_save_objects(PrognosisFactory.create_batch(2))
+    session.commit()
+
+    rows = session.execute(select_rows(Prognosis)).all()
+
+    assert [row.prognosis_id for row in rows] == [1, 2]
+    assert not session.identity_map
+
+
+def test_select_rows_only_named_columns(session, user):
+    row = session.execute(select_rows(User, {'id', 'username', 'email'})).one()
+
+    assert row._fields == ('id', 'username', 'email')
+
+
+def test_fetch_page_returns_rows_or_instances(session):
+    session.bulk_save_objects(PrognosisFactory.create_batch(3))
+    session.commit()
+
+    def page(query):
+        return asyncio.run(fetch_page(ThreadedSession(session), query, Prognosis.prognosis_id, None, 2))
+
+    rows, rows_cursor = page(select_rows(Prognosis))
+    instances, instances_cursor = page(select(Prognosis))
+
+    assert [row.prognosis_id for row in rows] == [1, 2]
+    assert all(isinstance(instance, Prognosis) for instance in instances)
+    assert rows_cursor == instances_cursor == encode_cursor(2)
@@ -0,0 +1,40 @@
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from fast_zero import passwords
+
+
+def test_configure_changes_parameters_and_keeps_old_hashes_valid():
+    old_hash = passwords.hash_password('secret')
+    original = passwords.get_pwd_context().current_hasher
+
+    passwords.configure(time_cost=1, memory_cost=8, parallelism=1)
+    try:
+        assert passwords.needs_rehash(old_hash)
+        assert passwords.verify_password('secret', old_hash)
+        assert not passwords.needs_rehash(passwords.hash_password('secret'))
+    finally:
+        passwords.get_pwd_context().current_hasher = original
+        passwords.get_pwd_context().hashers = (original,)
+
+
+def test_needs_rehash_with_current_parameters():
+    assert not passwords.needs_rehash(passwords.hash_password('secret'))
+    assert passwords.needs_rehash(Argon2Hasher(time_cost=1, memory_cost=8, parallelism=1).hash('secret'))
+
+
+def test_calibrate_stays_under_target():
+    target = 0.05
+    max_time_cost = 3
+
+    time_cost, elapsed = passwords.calibrate(target, memory_cost=8, parallelism=1, max_time_cost=max_time_cost)
+
+    assert 1 <= time_cost <= max_time_cost
+    assert elapsed <= target
+
+
+def test_calibration_command_prints_settings(capsys):
+    passwords.main(['--target-ms', '50', '--memory-mib', '1', '--parallelism', '1'])
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[2:] == ['ARGON2_MEMORY_COST=1024', 'ARGON2_PARALLELISM=1']
+    assert lines[1].startswith('ARGON2_TIME_COST=')
@@ -1,6 +1,18 @@
 from http import HTTPStatus
 
-from tests.conftest import PatientFactory
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from fast_zero.database import set_sqlite_pragmas
+from tests.conftest import (
+    ClinicalExaminationFactory,
+    ClinicalHistoryFactory,
+    ComplementaryExamFactory,
+    PatientFactory,
+    PhysiotherapyDiagnosisFactory,
+    PrognosisFactory,
+    TreatmentPlanFactory,
+)
 
 
 def test_create_patient(client, token):
@@ -82,6 +94,20 @@ def test_delete_patient(session, client, token):
     assert response.json() == {'message': 'Task has been deleted successfully.'}
 
 
+def test_delete_patient_with_records(session, client, async_session_factory, token, patient):
+    session.add(ClinicalHistoryFactory(patient_id=patient.id))
+    session.commit()
+    event.listen(async_session_factory.kw['bind'].sync_engine, 'connect', set_sqlite_pragmas)
+
+    response = client.delete(f'/patients/{patient.id}', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert response.json() == {'detail': 'Patient has clinical records.'}
+    assert client.get(f'/patients/{patient.id}/chart', headers={'Authorization': f'Bearer {token}'}).json()[
+        'clinical_histories'
+    ]
+
+
 def test_delete_patient_error(client, token):
     response = client.delete(f'/patients/{10}', headers={'Authorization': f'Bearer {token}'})
 
@@ -115,3 +141,149 @@ def test_patch_patient_error(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Task not found.'}
+
+
+def test_read_patient_chart(session, client, token, patient):
+    session.add_all(ClinicalHistoryFactory.create_batch(2, patient_id=patient.id))
+    session.add(ClinicalExaminationFactory(patient_id=patient.id))
+    session.add(ComplementaryExamFactory(patient_id=patient.id))
+    session.add(PhysiotherapyDiagnosisFactory(patient_id=patient.id))
+    session.add(PrognosisFactory(patient_id=patient.id))
+    session.add_all(TreatmentPlanFactory.create_batch(3, patient_id=patient.id))
+    session.commit()
+
+    response = client.get(f'/patients/{patient.id}/chart', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.OK
+    chart = response.json()
+    assert chart['id'] == patient.id
+    assert [history['history_id'] for history in chart['clinical_histories']] == [1, 2]
+    assert len(chart['clinical_examinations']) == 1
+    assert len(chart['complementary_exams']) == 1
+    assert len(chart['physiotherapy_diagnosis']) == 1
+    assert len(chart['prognosis']) == 1
+    assert [plan['plan_id'] for plan in chart['treatment_plans']] == [1, 2, 3]
+
+
+def test_read_patient_chart_query_count_does_not_grow_with_records(session, client, token, patient):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    def chart_queries():
+        statements.clear()
+        event.listen(Engine, 'before_cursor_execute', count)
+        try:
+            response = client.get(f'/patients/{patient.id}/chart', headers={'Authorization': f'Bearer {token}'})
+        finally:
+            event.remove(Engine, 'before_cursor_execute', count)
+        assert response.status_code == HTTPStatus.OK
+        return len(statements)
+
+    empty_chart_queries = chart_queries()
+
+    session.add_all(ClinicalHistoryFactory.create_batch(10, patient_id=patient.id))
+    session.add_all(TreatmentPlanFactory.create_batch(10, patient_id=patient.id))
+    session.commit()
+
+    assert chart_queries() == empty_chart_queries
+
+
+def test_read_patient_chart_error(client, token):
+    response = client.get('/patients/10/chart', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Patient not found.'}
+
+
+def test_list_patients_does_not_load_clinical_records(session, client, token, patient):
+    session.add(ClinicalHistoryFactory(patient_id=patient.id))
+    session.commit()
+
+    response = client.get('/patients', headers={'Authorization': f'Bearer {token}'})
+
+    assert 'clinical_histories' not in response.json()['patients'][0]
+
+
+def test_list_patients_include_loads_requested_records(session, client, token):
+    expected_plans = 2
+    patients = PatientFactory.create_batch(3)
+    session.add_all(patients)
+    session.commit()
+    for patient in patients:
+        session.add(ClinicalHistoryFactory(patient_id=patient.id))
+        session.add_all(TreatmentPlanFactory.create_batch(expected_plans, patient_id=patient.id))
+    session.commit()
+
+    response = client.get(
+        '/patients?include=treatment_plans,clinical_histories',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    for patient in response.json()['patients']:
+        assert {history['patient_id'] for history in patient['clinical_histories']} == {patient['id']}
+        assert len(patient['treatment_plans']) == expected_plans
+        assert 'prognosis' not in patient
+    assert response.json()['next_cursor'] is None
+
+
+def test_list_patients_include_issues_one_query_per_relation(session, client, token):
+    expected_queries = 3
+    session.add_all(PatientFactory.create_batch(10))
+    session.commit()
+    session.add_all(TreatmentPlanFactory.create_batch(10, patient_id=1))
+    session.add_all(ClinicalHistoryFactory.create_batch(10, patient_id=2))
+    session.commit()
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        response = client.get(
+            '/patients?include=treatment_plans,clinical_histories',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+
+    assert response.status_code == HTTPStatus.OK
+    patient_queries = [statement for statement in statements if 'users' not in statement]
+    assert len(patient_queries) == expected_queries
+
+
+def test_list_patients_include_unknown_relation(client, token):
+    response = client.get('/patients?include=invoices', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Unknown include: invoices.'}
+
+
+def test_bulk_create_patients(client, token):
+    payload = {
+        'full_name': 'Maria Aparecida',
+        'age': 58,
+        'place_of_birth': 'Rio de Janeiro-RJ',
+        'marital_status': 'Casada',
+        'gender': 'Feminino',
+        'profession': 'Professora',
+        'residential_address': 'Rua X, 345',
+        'commercial_address': 'Rua Y, 600',
+    }
+
+    response = client.post(
+        '/patients/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[payload, {**payload, 'age': 'unknown'}, payload],
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['ids'] == [1, None, 2]
+    [error] = response.json()['errors']
+    assert error['index'] == 1
+    assert error['detail'][0]['loc'] == ['age']
@@ -54,6 +54,20 @@ def test_list_physiotherapy_diagnosis_filter_diagnosis_details_should_return_5_p
     assert len(response.json()['physiotherapy_diagnosis']) == expected_physiotherapy_diagnosis
 
 
+def test_list_physiotherapy_diagnosis_filter_patient_id_should_return_3_physiotherapy_diagnosis(session, client, token):
+    expected_physiotherapy_diagnosis = 3
+    session.bulk_save_objects(PhysiotherapyDiagnosisFactory.create_batch(3, patient_id=2))
+    session.bulk_save_objects(PhysiotherapyDiagnosisFactory.create_batch(5, patient_id=1))
+    session.commit()
+
+    response = client.get(
+        '/physiotherapy-diagnosis/?patient_id=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['physiotherapy_diagnosis']) == expected_physiotherapy_diagnosis
+
+
 def test_delete_physiotherapy_diagnosis(session, client, token):
     physiotherapy_diagnosis = PhysiotherapyDiagnosisFactory()
     session.add(physiotherapy_diagnosis)
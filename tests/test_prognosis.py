@@ -52,6 +52,20 @@ def test_list_prognosis_filter_prognosis_details_should_return_5_prognosis(sessi
     assert len(response.json()['prognosis']) == expected_prognosis
 
 
+def test_list_prognosis_filter_patient_id_should_return_3_prognosis(session, client, token):
+    expected_prognosis = 3
+    session.bulk_save_objects(PrognosisFactory.create_batch(3, patient_id=2))
+    session.bulk_save_objects(PrognosisFactory.create_batch(5, patient_id=1))
+    session.commit()
+
+    response = client.get(
+        '/prognosis/?patient_id=2',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert len(response.json()['prognosis']) == expected_prognosis
+
+
 def test_delete_prognosis(session, client, token):
     prognosis = PrognosisFactory()
     session.add(prognosis)
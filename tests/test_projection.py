@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from fast_zero import projection
+from tests.conftest import ClinicalHistoryFactory, PatientFactory, TreatmentPlanFactory
+
+
+def captured_selects(client, url, token) -> tuple[list[str], dict]:
+    statements = []
+
+    def capture(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT') and 'users' not in statement:
+            statements.append(statement)
+
+    event.listen(Engine, 'before_cursor_execute', capture)
+    try:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(Engine, 'before_cursor_execute', capture)
+
+    assert response.status_code == HTTPStatus.OK
+    return statements, response.json()
+
+
+def test_split_fields_strips_and_drops_duplicates():
+    assert projection.split_fields(' age, id,,age ') == ['age', 'id']
+    assert projection.split_fields(None) == []
+
+
+def test_list_fields_restricts_response_and_keeps_primary_key(session, client, token, patient):
+    session.add(ClinicalHistoryFactory(patient_id=patient.id, main_complaint='Dor lombar'))
+    session.commit()
+
+    statements, body = captured_selects(client, '/clinical-history/?fields=main_complaint', token)
+
+    assert body['clinical_histories'] == [{'main_complaint': 'Dor lombar', 'history_id': 1}]
+    assert 'disease_history' not in statements[0]
+    assert 'lifestyle_habits' not in statements[0]
+
+
+def test_list_fields_unknown_field(client, token):
+    response = client.get('/prognosis/?fields=prognosis_details,owner', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Unknown field: owner.'}
+
+
+def test_list_defaults_to_previews_of_large_text(session, client, token, patient, monkeypatch):
+    expected_length = 10
+    monkeypatch.setattr(
+        projection, 'settings', projection.settings.model_copy(update={'TEXT_PREVIEW_LENGTH': expected_length})
+    )
+    session.add(TreatmentPlanFactory(patient_id=patient.id, procedures='Cinesioterapia e alongamentos diários'))
+    session.commit()
+
+    statements, body = captured_selects(client, '/treatment-plan/', token)
+
+    plan = body['treatment_plans'][0]
+    assert plan['procedures_preview'] == 'Cinesioter'
+    assert 'procedures' not in plan
+    assert 'objectives' in plan
+    assert statements[0].count('treatments_plan.procedures') == 1
+    assert 'substr(treatments_plan.procedures' in statements[0]
+
+
+def test_list_fields_can_ask_for_full_text(session, client, token, patient):
+    history = ClinicalHistoryFactory(patient_id=patient.id)
+    session.add(history)
+    session.commit()
+
+    response = client.get('/clinical-history/?fields=disease_history', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.json()['clinical_histories'] == [{'disease_history': history.disease_history, 'history_id': 1}]
+
+
+def test_list_patients_include_with_fields(session, client, token):
+    patient = PatientFactory(full_name='Maria Aparecida')
+    session.add(patient)
+    session.commit()
+    session.add(TreatmentPlanFactory(patient_id=patient.id, objectives='Reduzir a dor'))
+    session.commit()
+
+    statements, body = captured_selects(client, '/patients/?fields=full_name&include=treatment_plans', token)
+
+    [listed] = body['patients']
+    assert listed['full_name'] == 'Maria Aparecida'
+    assert listed['id'] == patient.id
+    assert 'age' not in listed
+    assert listed['treatment_plans'][0]['objectives'] == 'Reduzir a dor'
+    assert 'patients.age' not in statements[0]
+
+
+def test_chart_fields_per_section(session, client, token, patient):
+    session.add(ClinicalHistoryFactory(patient_id=patient.id, main_complaint='Dor no ombro'))
+    session.commit()
+
+    statements, body = captured_selects(
+        client, f'/patients/{patient.id}/chart?fields=full_name,clinical_histories.main_complaint', token
+    )
+
+    assert body['full_name'] == patient.full_name
+    assert 'age' not in body
+    assert body['clinical_histories'] == [{'main_complaint': 'Dor no ombro', 'history_id': 1}]
+    assert body['treatment_plans'] == []
+    assert not any('disease_history' in statement for statement in statements)
+
+
+def test_chart_without_fields_sends_full_text(session, client, token, patient):
+    history = ClinicalHistoryFactory(patient_id=patient.id)
+    session.add(history)
+    session.commit()
+
+    response = client.get(f'/patients/{patient.id}/chart', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.json()['clinical_histories'][0]['disease_history'] == history.disease_history
+
+
+def test_chart_fields_unknown_field(client, token, patient):
+    response = client.get(
+        f'/patients/{patient.id}/chart?fields=age,prognosis.owner,invoices.total',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json() == {'detail': 'Unknown field: prognosis.owner, invoices.total.'}
@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero import ratelimit
+from fast_zero.metrics import Counter, registry
+from fast_zero.ratelimit import TokenBucketLimiter
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr(ratelimit.time, 'monotonic', lambda: clock[0])
+    return clock
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    expected_wait = 20
+    limiter = TokenBucketLimiter(per_minute=3, max_keys=10, rejected=Counter('test_rejected_total', ''))
+
+    assert [limiter.acquire('ip') for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire('ip') == pytest.approx(expected_wait)
+
+    clock[0] += expected_wait
+    assert limiter.acquire('ip') == 0
+
+
+def test_buckets_are_per_key(clock):
+    limiter = TokenBucketLimiter(per_minute=1, max_keys=10, rejected=Counter('test_rejected_total', ''))
+
+    assert limiter.acquire('a') == 0
+    assert limiter.acquire('b') == 0
+    assert limiter.acquire('a') > 0
+
+
+def test_least_recently_used_keys_are_evicted(clock):
+    limiter = TokenBucketLimiter(per_minute=1, max_keys=2, rejected=Counter('test_rejected_total', ''))
+    for key in ('a', 'b', 'c'):
+        limiter.acquire(key)
+
+    assert list(limiter.buckets) == ['b', 'c']
+
+
+def test_zero_disables_the_limit(clock):
+    limiter = TokenBucketLimiter(per_minute=0, max_keys=10, rejected=Counter('test_rejected_total', ''))
+
+    assert all(limiter.acquire('ip') == 0 for _ in range(100))
+
+
+def test_login_is_limited_per_account(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_account_limiter, 'per_minute', 2)
+    rejected = ratelimit.login_account_limiter.rejected.value
+
+    responses = [
+        client.post('/auth/token', data={'username': user.email, 'password': 'wrong'}).status_code for _ in range(3)
+    ]
+
+    assert responses == [HTTPStatus.BAD_REQUEST, HTTPStatus.BAD_REQUEST, HTTPStatus.TOO_MANY_REQUESTS]
+    assert ratelimit.login_account_limiter.rejected.value == rejected + 1
+
+
+def test_login_limit_sends_retry_after(client, user, monkeypatch):
+    monkeypatch.setattr(ratelimit.login_ip_limiter, 'per_minute', 1)
+    client.post('/auth/token', data={'username': user.email, 'password': 'wrong'})
+
+    response = client.post('/auth/token', data={'username': 'someone@else.com', 'password': 'wrong'})
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.headers['Retry-After'] == '60'
+    assert response.json() == {'detail': 'Too many attempts, try again later.'}
+
+
+def test_signup_is_limited_per_ip(client, monkeypatch):
+    monkeypatch.setattr(ratelimit.signup_ip_limiter, 'per_minute', 1)
+
+    first = client.post('/users/', json={'username': 'alice', 'email': 'alice@example.com', 'password': 'secret'})
+    second = client.post('/users/', json={'username': 'bob', 'email': 'bob@example.com', 'password': 'secret'})
+
+    assert first.status_code == HTTPStatus.CREATED
+    assert second.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+def test_limiters_register_no_metrics(clock):
+    metrics = dict(registry.metrics)
+
+    TokenBucketLimiter(per_minute=1, max_keys=10, rejected=Counter('test_rejected_total', ''))
+
+    assert registry.metrics == metrics
@@ -0,0 +1,114 @@
+import asyncio
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import event, insert
+
+from fast_zero.models import RevokedToken
+from fast_zero.revocation import BloomFilter, RevocationList
+
+
+@pytest.fixture()
+def session_factory(async_session_factory):
+    async_session_factory.statements = []
+
+    def log(conn, cursor, statement, *args):
+        async_session_factory.statements.append(statement)
+
+    event.listen(async_session_factory.kw['bind'].sync_engine, 'before_cursor_execute', log)
+
+    return async_session_factory
+
+
+def in_an_hour():
+    return datetime.now(tz=ZoneInfo('UTC')) + timedelta(hours=1)
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    max_false_positives = 50
+    bloom = BloomFilter(capacity=1_000, error_rate=0.01)
+    for i in range(1_000):
+        bloom.add(f'revoked-{i}')
+
+    assert all(f'revoked-{i}' in bloom for i in range(1_000))
+    assert sum(f'valid-{i}' in bloom for i in range(1_000)) < max_false_positives
+
+
+def test_refresh_picks_up_tokens_revoked_elsewhere(session, session_factory):
+    revocations = RevocationList(capacity=100, error_rate=0.01, refresh_interval=60, overlap=10)
+
+    async def check():
+        async with session_factory() as async_session:
+            await revocations.refresh(async_session)
+            session.add(RevokedToken(jti='stolen', expires_at=in_an_hour()))
+            session.commit()
+            before = await revocations.is_revoked(async_session, 'stolen')
+            await revocations.refresh(async_session)
+            return before, await revocations.is_revoked(async_session, 'stolen')
+
+    assert asyncio.run(check()) == (False, True)
+
+
+def test_is_revoked_skips_the_database_for_unknown_tokens(session, session_factory):
+    session.add(RevokedToken(jti='stolen', expires_at=in_an_hour()))
+    session.commit()
+    revocations = RevocationList(capacity=100, error_rate=0.01, refresh_interval=60, overlap=10)
+
+    async def check():
+        async with session_factory() as async_session:
+            await revocations.refresh(async_session)
+            session_factory.statements.clear()
+            valid = await revocations.is_revoked(async_session, 'never-revoked')
+            queries_for_valid = len(session_factory.statements)
+            revoked = await revocations.is_revoked(async_session, 'stolen')
+            await revocations.is_revoked(async_session, 'stolen')
+            return valid, queries_for_valid, revoked, len(session_factory.statements)
+
+    assert asyncio.run(check()) == (False, 0, True, 1)
+
+
+def test_refresh_ignores_expired_revocations(session, session_factory):
+    session.add(RevokedToken(jti='old', expires_at=datetime.now(tz=ZoneInfo('UTC')) - timedelta(hours=1)))
+    session.commit()
+    revocations = RevocationList(capacity=100, error_rate=0.01, refresh_interval=60, overlap=10)
+
+    async def check():
+        async with session_factory() as async_session:
+            await revocations.refresh(async_session)
+
+    asyncio.run(check())
+
+    assert 'old' not in revocations.bloom
+
+
+def test_refresh_picks_up_lower_ids_committed_late(session, session_factory):
+    expected_count = 2
+    session.execute(insert(RevokedToken).values(id=5, jti='committed-first', expires_at=in_an_hour()))
+    session.commit()
+    revocations = RevocationList(capacity=100, error_rate=0.01, refresh_interval=60, overlap=10)
+
+    async def check():
+        async with session_factory() as async_session:
+            await revocations.refresh(async_session)
+            session.execute(insert(RevokedToken).values(id=3, jti='committed-late', expires_at=in_an_hour()))
+            session.commit()
+            await revocations.refresh(async_session)
+            return await revocations.is_revoked(async_session, 'committed-late')
+
+    assert asyncio.run(check()) is True
+    assert revocations.bloom.count == expected_count
+
+
+def test_refresh_forgets_exact_answers(session, session_factory):
+    revocations = RevocationList(capacity=100, error_rate=0.01, refresh_interval=60, overlap=10)
+    revocations.remember('stolen')
+
+    async def check():
+        async with session_factory() as async_session:
+            await revocations.refresh(async_session)
+
+    asyncio.run(check())
+
+    assert revocations.known == {}
+    assert 'stolen' in revocations.bloom
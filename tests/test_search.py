@@ -0,0 +1,84 @@
+import subprocess
+import sys
+from http import HTTPStatus
+
+from fast_zero.models import SEARCH_INDEXES
+from tests.conftest import ClinicalHistoryFactory, TreatmentPlanFactory
+
+
+def test_search_clinical_history_ranks_and_highlights(session, client):
+    session.add(ClinicalHistoryFactory(main_complaint='Dor lombar', disease_history='Dor lombar há três meses'))
+    session.add(ClinicalHistoryFactory(main_complaint='Dor no joelho', disease_history='Lesão lombar antiga'))
+    session.add(ClinicalHistoryFactory(main_complaint='Cefaleia', disease_history='Sem histórico'))
+    session.commit()
+
+    response = client.get('/search/clinical-history?q=lombar')
+    results = response.json()['results']
+
+    assert response.status_code == HTTPStatus.OK
+    assert [result['id'] for result in results] == [1, 2]
+    assert results[0]['rank'] > results[1]['rank']
+    assert '<mark>lombar</mark>' in results[0]['snippet']
+
+
+def test_search_ignores_accents_and_fts_syntax(session, client):
+    session.add(TreatmentPlanFactory(objectives='Reeducação postural', procedures='Alongamento'))
+    session.commit()
+
+    response = client.get('/search/treatment-plan?q=reeducacao" -(')
+
+    assert [result['id'] for result in response.json()['results']] == [1]
+
+
+def test_search_follows_updates_and_deletes(session, client):
+    clinical_history = ClinicalHistoryFactory(main_complaint='Dor cervical')
+    session.add(clinical_history)
+    session.commit()
+
+    client.patch('/clinical-history/1', json={'main_complaint': 'Tendinite no ombro'})
+    assert client.get('/search/clinical-history?q=cervical').json() == {'results': []}
+    assert len(client.get('/search/clinical-history?q=tendinite').json()['results']) == 1
+
+    client.delete('/clinical-history/1')
+    assert client.get('/search/clinical-history?q=tendinite').json() == {'results': []}
+
+
+def test_search_filters_by_patient(session, client):
+    session.add(ClinicalHistoryFactory(main_complaint='Dor lombar', patient_id=1))
+    session.add(ClinicalHistoryFactory(main_complaint='Dor lombar', patient_id=2))
+    session.commit()
+
+    response = client.get('/search/clinical-history?q=lombar&patient_id=2')
+
+    assert [result['patient_id'] for result in response.json()['results']] == [2]
+
+
+def test_search_filters_by_patient_zero(session, client):
+    session.add(ClinicalHistoryFactory(main_complaint='Dor lombar', patient_id=1))
+    session.commit()
+
+    response = client.get('/search/clinical-history?q=lombar&patient_id=0')
+
+    assert response.json()['results'] == []
+
+
+def test_search_unknown_resource(client):
+    response = client.get('/search/users?q=maria')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert response.json() == {'detail': 'Resource is not searchable.'}
+
+
+def test_create_all_builds_the_indexes_without_the_app(tmp_path):
+    script = (
+        'from sqlalchemy import create_engine, text\n'
+        'from fast_zero.models import table_registry\n'
+        f"engine = create_engine('sqlite:///{tmp_path / 'fresh.db'}')\n"
+        'table_registry.metadata.create_all(engine)\n'
+        'with engine.connect() as connection:\n'
+        '    print(connection.scalar(text("SELECT count(*) FROM sqlite_master WHERE name LIKE \'%_fts\'")))\n'
+    )
+
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == str(len(SEARCH_INDEXES))
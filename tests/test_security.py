@@ -1,8 +1,24 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
 from http import HTTPStatus
 
+import pytest
+from fastapi import HTTPException
+from freezegun import freeze_time
 from jwt import decode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
-from fast_zero.security import create_access_token, settings
+from fast_zero.security import (
+    PasswordHasher,
+    TokenCache,
+    create_access_token,
+    password_hash_seconds,
+    settings,
+    token_cache_hits,
+    verify_password,
+)
 
 
 def test_jwt():
@@ -20,3 +36,89 @@ def test_jwt_invalid_token(client):
 
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_token_cache_skips_the_user_lookup(client, user, token):
+    hits = token_cache_hits.value
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    client.post('/auth/refresh_token', headers={'Authorization': f'Bearer {token}'})
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        response = client.post('/auth/refresh_token', headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+
+    assert response.status_code == HTTPStatus.OK
+    assert token_cache_hits.value == hits + 1
+    assert statements == []
+
+
+def test_token_cache_is_invalidated_when_the_user_changes(client, user, token):
+    client.post('/auth/refresh_token', headers={'Authorization': f'Bearer {token}'})
+
+    client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'username': 'bob', 'email': 'bob@test.com', 'password': 'secret'},
+    )
+    response = client.post('/auth/refresh_token', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_token_cache_evicts_least_recently_used(user):
+    cache = TokenCache(ttl=60, max_size=2)
+    exp = time.time() + 60
+    cache.put('a', user, 'jti-a', exp)
+    cache.put('b', user, 'jti-b', exp)
+    cache.get('a')
+    cache.put('c', user, 'jti-c', exp)
+
+    assert list(cache.entries) == ['a', 'c']
+
+
+def test_token_cache_entries_expire_with_the_token(user):
+    cache = TokenCache(ttl=60, max_size=10)
+    cache.put('token', user, 'jti', time.time() + 5)
+
+    with freeze_time(datetime.now() + timedelta(seconds=6)):
+        assert cache.get('token') is None
+
+
+def test_password_hasher_runs_in_worker_processes():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    observed = password_hash_seconds.count
+
+    async def hash_and_verify():
+        hashed = await hasher.hash('secret')
+        return await hasher.verify('secret', hashed), await hasher.verify('wrong', hashed)
+
+    try:
+        assert asyncio.run(hash_and_verify()) == (True, False)
+    finally:
+        hasher.close()
+
+    assert password_hash_seconds.count == observed + 3
+
+
+def test_password_hasher_without_workers_uses_the_threadpool():
+    hasher = PasswordHasher(workers=0, max_pending=4)
+
+    hashed = asyncio.run(hasher.hash('secret'))
+
+    assert hasher.executor is None
+    assert verify_password('secret', hashed)
+
+
+def test_password_hasher_refuses_work_past_max_pending():
+    hasher = PasswordHasher(workers=0, max_pending=0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(hasher.hash('secret'))
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert exc_info.value.headers == {'Retry-After': '1'}
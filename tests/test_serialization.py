@@ -0,0 +1,79 @@
+from http import HTTPStatus
+
+import pytest
+
+from fast_zero import serialization
+from fast_zero.schemas import PrognosisList
+from tests.conftest import (
+    ClinicalExaminationFactory,
+    ClinicalHistoryFactory,
+    ComplementaryExamFactory,
+    PhysiotherapyDiagnosisFactory,
+    PrognosisFactory,
+    TreatmentPlanFactory,
+    UserFactory,
+)
+
+LIST_URLS = [
+    '/users/',
+    '/patients/',
+    '/patients/?include=prognosis,treatment_plans',
+    '/clinical-history/',
+    '/clinical-examination/',
+    '/complementary-exams/',
+    '/physiotherapy-diagnosis/',
+    '/prognosis/',
+    '/treatment-plan/',
+]
+
+
+def fast_serialization(monkeypatch, enabled: bool):
+    monkeypatch.setattr(
+        serialization, 'settings', serialization.settings.model_copy(update={'FAST_SERIALIZATION': enabled})
+    )
+
+
+@pytest.fixture()
+def records(session, patient):
+    session.add_all(UserFactory.create_batch(3))
+    for factory in (
+        ClinicalHistoryFactory,
+        ClinicalExaminationFactory,
+        ComplementaryExamFactory,
+        PhysiotherapyDiagnosisFactory,
+        PrognosisFactory,
+        TreatmentPlanFactory,
+    ):
+        session.add_all(factory.create_batch(3, patient_id=patient.id))
+    session.commit()
+
+
+@pytest.mark.parametrize('url', LIST_URLS)
+def test_fast_serialization_sends_the_same_body(client, records, monkeypatch, url):
+    fast_serialization(monkeypatch, enabled=False)
+    standard = client.get(url)
+    fast_serialization(monkeypatch, enabled=True)
+    fast = client.get(url)
+
+    assert fast.status_code == HTTPStatus.OK
+    assert fast.headers['content-type'] == 'application/json'
+    assert fast.json() == standard.json()
+
+
+def test_render_returns_content_when_disabled(monkeypatch):
+    fast_serialization(monkeypatch, enabled=False)
+    content = {'prognosis': [], 'next_cursor': None}
+
+    assert serialization.render(PrognosisList, content) is content
+
+
+def test_render_encodes_orm_objects(monkeypatch):
+    fast_serialization(monkeypatch, enabled=True)
+    prognosis = PrognosisFactory(patient_id=1, prognosis_details='Bom')
+    prognosis.prognosis_id = 1
+
+    response = serialization.render(PrognosisList, {'prognosis': [prognosis], 'next_cursor': None})
+
+    assert response.body == (
+        b'{"prognosis":[{"patient_id":1,"prognosis_details":"Bom","prognosis_id":1}],"next_cursor":null}'
+    )
@@ -0,0 +1,13 @@
+import pytest
+from pydantic import ValidationError
+
+from fast_zero.settings import get_settings
+
+
+def test_settings_are_read_once():
+    assert get_settings() is get_settings()
+
+
+def test_settings_are_immutable():
+    with pytest.raises(ValidationError):
+        get_settings().PAGE_SIZE_MAX = 1
@@ -28,7 +28,7 @@ def test_read_users(client):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
 def test_read_users_with_user(client, user):
@@ -36,7 +36,7 @@ def test_read_users_with_user(client, user):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {'users': [user_schema], 'next_cursor': None}
 
 
 def test_update_user(client, user, token):